@@ -0,0 +1,108 @@
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from common import dbg
+
+# Third-party ad / analytics / tracking hosts; never needed for the audio.
+AD_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com",
+    "google-analytics.com", "googletagmanager.com", "adnxs.com",
+    "amazon-adsystem.com", "adsrvr.org", "criteo.com", "moatads.com",
+    "scorecardresearch.com", "quantserve.com", "demdex.net", "omtrdc.net",
+    "chartbeat.com", "taboola.com", "outbrain.com", "facebook.net",
+    "hotjar.com", "nr-data.net", "krxd.net", "bounceexchange.com",
+)
+
+# Per-league rules, checked in order: allow (URL regexes, always pass),
+# deny_types (Playwright resource types), deny (URL regexes), deny_hosts.
+# Video renditions are only denied where the audio travels separately.
+AUDIO_ONLY_RULES = {
+    "nba": {
+        "allow":      [r"cookielaw\.org", r"onetrust\.com"],
+        "deny_types": {"image", "font"},
+        "deny":       [],
+        "deny_hosts": AD_HOSTS,
+    },
+    "mlb": {
+        "allow":      [r"cookielaw\.org", r"onetrust\.com", r"okta", r"/audio/"],
+        "deny_types": {"image", "font"},
+        # separate-track video segments (CMAF/HLS); the audio feed is its own rendition
+        "deny":       [r"/video/[^?]*\.(m4s|ts|mp4)(\?|$)"],
+        "deny_hosts": AD_HOSTS,
+    },
+}
+
+# URL shapes of the deny_types, so only candidate requests are routed at all;
+# the resource type is still checked before anything is aborted.
+TYPE_PATTERNS = {
+    "image": r"\.(png|jpe?g|gif|webp|avif|svg|ico)(\?|$)",
+    "font":  r"\.(woff2?|ttf|otf|eot)(\?|$)",
+}
+
+# Rough payload sizes per resource type, for the bytes-saved estimate; an
+# aborted request never tells us its real size.
+TYPICAL_BYTES = {"image": 40_000, "font": 35_000, "media": 400_000,
+                 "script": 60_000, "xhr": 5_000, "fetch": 5_000}
+
+
+class PageBlocker:
+    """Playwright route handler that aborts what an audio-only page doesn't need,
+    and counts what it aborted.
+
+    Only URLs that could be denied are routed (deny patterns, deny hosts, the
+    file types of deny_types); everything else, HLS segments included, never
+    reaches Python.
+    """
+
+    def __init__(self, league, rules=None):
+        rules = rules or AUDIO_ONLY_RULES.get(league, AUDIO_ONLY_RULES["nba"])
+        self.league      = league
+        self.allow       = [re.compile(p) for p in rules["allow"]]
+        self.deny        = [re.compile(p) for p in rules["deny"]]
+        self.deny_types  = set(rules["deny_types"])
+        self.deny_hosts  = tuple(rules["deny_hosts"])
+        hosts = "|".join(re.escape(h) for h in self.deny_hosts)
+        self.routed      = re.compile("|".join(
+            [p.pattern for p in self.deny]
+            + [TYPE_PATTERNS[t] for t in sorted(self.deny_types) if t in TYPE_PATTERNS]
+            + ([rf"^[a-z]+://([^/?#]*\.)?({hosts})(:\d+)?([/?#]|$)"] if hosts else [])))
+        self.blocked     = Counter()   # reason -> count
+        self.bytes_saved = 0
+        self.passed      = 0
+
+    def verdict(self, url, resource_type):
+        """Return the reason to block url, or None to let it through."""
+        if any(p.search(url) for p in self.allow):
+            return None
+        if resource_type in self.deny_types:
+            return resource_type
+        if any(p.search(url) for p in self.deny):
+            return "video"
+        host = urlsplit(url).hostname or ""
+        if any(host == h or host.endswith("." + h) for h in self.deny_hosts):
+            return "tracker"
+        return None
+
+    async def attach(self, page):
+        await page.route(self.routed, self._handle)
+
+    async def _handle(self, route):
+        req    = route.request
+        reason = self.verdict(req.url, req.resource_type)
+        if reason is None:
+            self.passed += 1
+            await route.continue_()
+            return
+        self.blocked[reason] += 1
+        self.bytes_saved += TYPICAL_BYTES.get(req.resource_type, 20_000)
+        await route.abort("blockedbyclient")
+
+    def summary(self):
+        total = sum(self.blocked.values())
+        parts = ", ".join(f"{k}={v}" for k, v in self.blocked.most_common())
+        return (f"{self.league} audio-only: blocked {total} of {total + self.passed} routed requests"
+                f" ({parts or 'none'}), ~{self.bytes_saved // 1024} KB saved")
+
+    def report(self):
+        dbg(self.summary())
@@ -0,0 +1,331 @@
+"""Switch-latency benchmarks against the offline replay server.
+
+Runs each stage of a game switch — scoreboard fetch, render, TTS and
+StreamManager.open (through to audible) — many times against
+replay_server.py and writes p50/p95 per stage as JSON.
+
+    python bench.py                                  # every stage, 20 iterations
+    python bench.py --stages fetch,render,tts -n 100
+    python bench.py --stages open --channel msedge --headed
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+STAGES      = ("fetch", "render", "tts", "open")
+SCENARIOS   = ("cold", "warm", "rapid")
+RESULTS_DIR = Path(__file__).parent / "bench_results"
+SAMPLE_DAY  = Path(__file__).parent / "fixtures" / "replay" / "sample_day.json"
+
+# page is audible once some unmuted media element is actually playing
+AUDIBLE_JS = """
+() => [...document.querySelectorAll('audio, video')]
+        .some(m => !m.paused && !m.muted && m.currentTime > 0)
+"""
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (p in 0..100)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class Samples:
+    """Named latency samples in seconds, summarized in ms."""
+
+    def __init__(self):
+        self.samples  = {}   # metric -> [seconds]
+        self.counters = {}   # name -> int
+
+    def add(self, metric, seconds):
+        self.samples.setdefault(metric, []).append(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        out = {}
+        for metric, vals in self.samples.items():
+            out[metric] = {
+                "n":       len(vals),
+                "p50_ms":  round(percentile(vals, 50) * 1000, 2),
+                "p95_ms":  round(percentile(vals, 95) * 1000, 2),
+                "mean_ms": round(sum(vals) / len(vals) * 1000, 2),
+                "max_ms":  round(max(vals) * 1000, 2),
+            }
+        return out
+
+
+async def bench_fetch(samples, cache, n):
+    """Full slate refresh per league, revalidating every time (max_age=0)."""
+    from leagues import LEAGUES
+
+    for _ in range(n):
+        for league in LEAGUES:
+            t = time.perf_counter()
+            await cache.slate(league, max_age=0)
+            samples.add(f"fetch.{league}", time.perf_counter() - t)
+    for k in ("not_modified", "miss", "retry", "error"):
+        samples.count(f"http.{k}", cache.http.stats[k])
+
+
+async def bench_render(samples, cache, n):
+    """Payload → Game records → on-screen lines, into Tk labels when a display exists."""
+    from leagues import LEAGUES
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        lbl1, lbl2 = tk.Label(root), tk.Label(root)
+        lbl1.pack(), lbl2.pack()
+    except Exception:
+        root = None
+        samples.count("render.no_display")
+
+    payloads = [(league, adapter, day, await cache.http.get_json(adapter.scoreboard_url(day)))
+                for league, adapter in LEAGUES.items() for day in cache.window(league)]
+    try:
+        for _ in range(n):
+            for league, adapter, day, data in payloads:
+                t = time.perf_counter()
+                for g in adapter.parse(data, day):
+                    text = f"{g.status_line}\n{g.score_line}".strip()
+                    if root:
+                        lbl1.config(text=g.match)
+                        lbl2.config(text=text)
+                        root.update_idletasks()
+                samples.add(f"render.{league}", time.perf_counter() - t)
+    finally:
+        if root:
+            root.destroy()
+
+
+def bench_tts(samples, cache, n, online):
+    """Clip lookup for every announcement line: disk tier (decode), then memory tier.
+
+    Offline, each phrase's disk entry is seeded with the bundled speech.mp3 so
+    nothing goes to gTTS; with online, a cold cache measures real synthesis.
+    """
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from common import PROJECT_DIR
+    from leagues import LEAGUES
+    from tts import TTSCache
+
+    pygame.mixer.init()
+    lines = set()
+    for league in LEAGUES:
+        for day in cache.window(league):
+            snap = cache.peek(league, day)
+            for g in snap.games if snap else ():
+                lines.update(t for t in (g.match, g.status_line, g.score_line) if t)
+
+    for _ in range(n):
+        tmp = Path(tempfile.mkdtemp(prefix="bench-tts-"))
+        try:
+            speech = TTSCache(directory=tmp)
+            tier   = "synth" if online else "disk"
+            if not online:
+                for text in lines:
+                    shutil.copyfile(PROJECT_DIR / "speech.mp3", speech.path(text))
+            for text in lines:
+                t = time.perf_counter()
+                speech.get(text)
+                samples.add(f"tts.{tier}", time.perf_counter() - t)
+            for text in lines:
+                t = time.perf_counter()
+                speech.get(text)
+                samples.add("tts.mem", time.perf_counter() - t)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        if online:
+            break   # one cold pass is plenty of requests to Google
+    pygame.mixer.quit()
+
+
+async def wait_audible(page, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if await page.evaluate(AUDIBLE_JS):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def bench_open(samples, cache, n, scenarios, args):
+    """StreamManager.open against the fixture pages, per scenario.
+
+    cold:  no warm pool, one switch at a time.
+    warm:  warm pool on, dwelling between switches so warming can finish.
+    rapid: bursts of switches args.rapid_gap apart through NavigationSupervisor;
+           only the switch that survives each burst is timed.
+    """
+    from browser import SharedBrowser
+    from leagues import LEAGUES
+    from main import NavigationSupervisor, StreamManager
+
+    games = []
+    for league in LEAGUES:
+        games.extend(g for g in await cache.slate(league) if g.should_stream())
+    if not games:
+        samples.count("open.no_streamable_games")
+        return
+    urls = [(g.league, g.stream_url) for g in games]
+
+    browser = SharedBrowser(channel=args.channel, headless=not args.headed,
+                            args=["--autoplay-policy=no-user-gesture-required"])
+
+    async def timed(mgr, url, scenario, t0=None):
+        t0 = t0 or time.perf_counter()
+        await mgr.open(url)
+        samples.add(f"open.{scenario}", time.perf_counter() - t0)
+        if await wait_audible(mgr.page, args.audible_timeout):
+            samples.add(f"audible.{scenario}", time.perf_counter() - t0)
+        else:
+            samples.count(f"audible.{scenario}.timeout")
+
+    try:
+        for scenario in scenarios:
+            pool = 0 if scenario == "cold" else 2
+            mgrs = {name: StreamManager(a.profile, browser, pool_size=pool)
+                    for name, a in LEAGUES.items()}
+            try:
+                if scenario == "rapid":
+                    nav = NavigationSupervisor(asyncio.get_running_loop())
+                    for b in range(n):
+                        last = None
+                        for k in range(args.burst):
+                            league, url = urls[(b * args.burst + k) % len(urls)]
+                            gen  = nav.begin()
+                            done = asyncio.Event()
+
+                            async def switch(mgr=mgrs[league], url=url, done=done, t0=time.perf_counter()):
+                                try:
+                                    await timed(mgr, url, scenario, t0)
+                                except asyncio.CancelledError:
+                                    samples.count("open.rapid.superseded")
+                                    raise
+                                finally:
+                                    done.set()
+                            nav.submit(gen, switch())
+                            last = done
+                            await asyncio.sleep(args.rapid_gap)
+                        await last.wait()
+                else:
+                    for i in range(n):
+                        league, url = urls[i % len(urls)]
+                        await timed(mgrs[league], url, scenario)
+                        if pool:
+                            ahead = [u for lg, u in (urls[(i + k) % len(urls)] for k in range(1, 4))
+                                     if lg == league]
+                            mgrs[league].schedule_warm(ahead)
+                            await asyncio.sleep(args.dwell)
+            finally:
+                for mgr in mgrs.values():
+                    for blocker in mgr.blockers.values():
+                        samples.count("open.blocked", sum(blocker.blocked.values()))
+                    await mgr.close()
+        rss, procs = browser.processes.rss()
+        samples.count("browser.rss_mb", rss // 2**20)
+        samples.count("browser.processes", procs)
+    finally:
+        await browser.close()
+
+
+async def run(args):
+    import replay_server
+    from http_client import HttpClient
+    from leagues import point_at
+    from scoreboard import ScoreboardCache
+
+    rec = replay_server.Recording.load(Path(args.recording), args.speed)
+    runner, base = await replay_server.start(rec, latency_ms=args.latency_ms,
+                                             hydrate_ms=args.hydrate_ms)
+    point_at(base)
+    samples = Samples()
+    stages  = [s.strip() for s in args.stages.split(",")]
+    cache   = ScoreboardCache(HttpClient())
+    try:
+        # later stages work from the fetched slate, so fetch always runs at least once
+        await bench_fetch(samples, cache, args.iterations if "fetch" in stages else 1)
+        if "render" in stages:
+            await bench_render(samples, cache, args.iterations)
+        if "tts" in stages:
+            await asyncio.get_running_loop().run_in_executor(
+                None, bench_tts, samples, cache, args.iterations, args.online_tts)
+        if "open" in stages:
+            scenarios = [s.strip() for s in args.scenarios.split(",")]
+            await bench_open(samples, cache, args.iterations, scenarios, args)
+    finally:
+        await cache.http.close()
+        await runner.cleanup()
+    if "fetch" not in stages:
+        samples.samples = {k: v for k, v in samples.samples.items() if not k.startswith("fetch.")}
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--stages", default=",".join(STAGES))
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS), help="for the open stage")
+    ap.add_argument("-n", "--iterations", type=int, default=20)
+    ap.add_argument("--recording", default=str(SAMPLE_DAY))
+    ap.add_argument("--speed", type=float, default=1.0)
+    ap.add_argument("--latency-ms", type=int, default=20, help="replay server delay per response")
+    ap.add_argument("--hydrate-ms", type=int, default=150, help="fixture button render delay")
+    ap.add_argument("--channel", default=None, help="browser channel; default bundled Chromium")
+    ap.add_argument("--headed", action="store_true")
+    ap.add_argument("--dwell", type=float, default=2.0, help="seconds between warm-scenario switches")
+    ap.add_argument("--burst", type=int, default=4, help="switches per rapid-scenario burst")
+    ap.add_argument("--rapid-gap", type=float, default=0.25, help="seconds between rapid switches")
+    ap.add_argument("--audible-timeout", type=float, default=10.0)
+    ap.add_argument("--online-tts", action="store_true", help="time real gTTS synthesis")
+    ap.add_argument("--out", default=None, help="results JSON (default bench_results/<time>.json)")
+    args = ap.parse_args()
+
+    # profiles, credentials and the schedule db stay out of the real ~/mlb_app_data
+    home = Path(tempfile.mkdtemp(prefix="bench-home-"))
+    os.environ["HOME"] = os.environ["USERPROFILE"] = str(home)
+    from common import BASE_DIR
+    for league in ("nba", "mlb"):
+        (BASE_DIR / f"credentials-{league}.txt").write_text("replay@example.com\nreplay\n")
+
+    started = datetime.now()
+    try:
+        samples = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    result = {
+        "started":    started.isoformat(timespec="seconds"),
+        "host":       platform.node(),
+        "platform":   platform.platform(),
+        "python":     platform.python_version(),
+        "recording":  args.recording,
+        "iterations": args.iterations,
+        "options":    {k: v for k, v in vars(args).items() if k not in ("out", "recording")},
+        "metrics":    samples.summary(),
+        "counters":   samples.counters,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"bench-{started:%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+
+    print(f"{'metric':<24}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for metric, m in sorted(result["metrics"].items()):
+        print(f"{metric:<24}{m['n']:>6}{m['p50_ms']:>10}{m['p95_ms']:>10}{m['max_ms']:>10}")
+    for name, v in sorted(samples.counters.items()):
+        print(f"{name:<24}{v:>6}")
+    print("Results written to", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from common import dbg
+from tracing import tracer
+
+IO_WORKERS      = 4       # blocking file/process work off the loop
+UI_QUEUE_MAX    = 512     # pending Tk callbacks before the oldest are dropped
+FRAME_MS        = 16      # Tk callbacks are run in batches at most this often
+LAG_INTERVAL    = 0.25    # seconds between event-loop heartbeats
+STALL_THRESHOLD = 0.2     # loop blocked this long (seconds) gets logged with its culprit
+
+
+class LoopBridge:
+    """The one crossing point between the Tk thread and the asyncio loop thread.
+
+    to_ui() queues a Tk callback from any thread; queued callbacks run in one
+    batch per frame, and a callback given a key replaces any pending one with
+    the same key (keyed callbacks run after the unkeyed ones). to_loop() runs a coroutine on the loop, optionally handing
+    its result back to Tk. Blocking work goes through io() / submit_io(), a
+    fixed-size pool that is also the loop's default executor.
+
+    A heartbeat on the loop measures scheduling lag into the loop.lag
+    histogram; a watchdog thread notices a heartbeat that is overdue and logs
+    the task and stack that are holding the loop.
+
+    root may be None (the headless daemon); everything but to_ui() still works.
+    """
+
+    def __init__(self, root, loop, io_workers=IO_WORKERS, ui_queue_max=UI_QUEUE_MAX,
+                 frame_ms=FRAME_MS, lag_interval=LAG_INTERVAL, stall_threshold=STALL_THRESHOLD):
+        self.root            = root
+        self.loop            = loop
+        self.frame_ms        = frame_ms
+        self.lag_interval    = lag_interval
+        self.stall_threshold = stall_threshold
+        self.pool            = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        self.stats           = {"ui_calls": 0, "ui_batches": 0, "ui_coalesced": 0,
+                                "ui_dropped": 0, "stalls": 0}
+        self._ui             = deque()         # (fn, args) in arrival order
+        self._ui_keyed       = OrderedDict()   # key -> (fn, args), latest wins
+        self._ui_max         = ui_queue_max
+        self._ui_lock        = threading.Lock()
+        self._pump_scheduled = False
+        self._last_pump      = 0.0
+        self._beat_at        = time.monotonic()
+        self._loop_thread    = None
+        self._stopped        = threading.Event()
+
+    def start(self):
+        """Call once the loop thread is running."""
+        self.loop.call_soon_threadsafe(self._attach)
+        threading.Thread(target=self._watch, daemon=True, name="loop-watchdog").start()
+
+    def _attach(self):
+        self.loop.set_default_executor(self.pool)
+        tracer.use_executor(self.pool.submit)
+        self._loop_thread = threading.get_ident()
+        self._beat_at     = time.monotonic()
+        self.loop.create_task(self._heartbeat())
+
+    def close(self):
+        self._stopped.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # — Tk side —
+
+    def to_ui(self, fn, *args, key=None):
+        """Run fn(*args) on the Tk thread in the next batch; safe from any thread."""
+        with self._ui_lock:
+            if key is not None:
+                if key in self._ui_keyed:
+                    self.stats["ui_coalesced"] += 1
+                    del self._ui_keyed[key]
+                self._ui_keyed[key] = (fn, args)
+            else:
+                if len(self._ui) >= self._ui_max:
+                    dropped = self._ui.popleft()
+                    self.stats["ui_dropped"] += 1
+                    dbg("UI queue full; dropped", getattr(dropped[0], "__qualname__", dropped[0]))
+                self._ui.append((fn, args))
+            if self._pump_scheduled:
+                return
+            self._pump_scheduled = True
+        # an isolated update runs right away; a burst is paced to one batch per frame
+        wait = self._last_pump + self.frame_ms / 1000 - time.monotonic()
+        self.root.after(max(0, int(wait * 1000)), self._pump)
+
+    def _pump(self):
+        with self._ui_lock:
+            batch = list(self._ui) + list(self._ui_keyed.values())
+            self._ui.clear()
+            self._ui_keyed.clear()
+            self._pump_scheduled = False
+            self._last_pump      = time.monotonic()
+        self.stats["ui_batches"] += 1
+        for fn, args in batch:
+            self.stats["ui_calls"] += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                dbg(f"UI callback {getattr(fn, '__qualname__', fn)} failed:", e)
+
+    # — loop side —
+
+    def to_loop(self, coro, then=None):
+        """Schedule coro on the loop; then(result) runs on Tk if it succeeds."""
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def done(f):
+            if f.cancelled():
+                return
+            if f.exception():
+                dbg(f"{getattr(coro, '__qualname__', coro)} failed:", f.exception())
+            elif then:
+                self.to_ui(then, f.result())
+        fut.add_done_callback(done)
+        return fut
+
+    async def io(self, fn, *args):
+        """Await fn(*args) run on the I/O pool."""
+        return await self.loop.run_in_executor(self.pool, fn, *args)
+
+    def submit_io(self, fn, *args):
+        """Fire-and-forget fn(*args) on the I/O pool, from any thread."""
+        fut = self.pool.submit(fn, *args)
+        fut.add_done_callback(
+            lambda f: f.exception() and dbg(f"{getattr(fn, '__qualname__', fn)} failed:", f.exception()))
+        return fut
+
+    # — lag watchdog —
+
+    async def _heartbeat(self):
+        while not self._stopped.is_set():
+            due = time.monotonic() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            now = time.monotonic()
+            tracer.observe("loop.lag", max(0.0, now - due))
+            self._beat_at = now
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.lag_interval / 2):
+            overdue = time.monotonic() - self._beat_at - self.lag_interval
+            if overdue < self.stall_threshold:
+                reported = None
+                continue
+            if reported == self._beat_at:
+                continue   # one report per stall
+            reported = self._beat_at
+            self.stats["stalls"] += 1
+            dbg(f"Event loop blocked {overdue * 1000:.0f} ms so far, in {self._culprit()}")
+
+    def _culprit(self):
+        """The task the loop is running right now and where it is stuck."""
+        task  = asyncio.current_task(self.loop)
+        name  = task.get_coro().__qualname__ if task else "a callback"
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return name
+        where = "; ".join(f"{os.path.basename(fs.filename)}:{fs.lineno} {fs.name}"
+                          for fs in traceback.extract_stack(frame)[-3:])
+        return f"{name} ({where})"
@@ -0,0 +1,368 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from common import BASE_DIR, dbg
+from tracing import tracer
+
+PID_FILE = BASE_DIR / "browser_pids.json"
+
+MEMORY_CHECK_INTERVAL = 60   # seconds between RSS samples of the browser tree
+RENEW_SETTLE          = 5    # seconds for closed renderers to exit before "after" is sampled
+
+# Persistent-profile housekeeping, relative to the user-data dir. Cookies,
+# Local/Session Storage, IndexedDB and Login Data are never touched.
+HTTP_CACHE_MB = 128   # also passed to Edge as --disk-cache-size
+CODE_CACHE_MB = 64
+PROFILE_CAPS  = {"Default/Cache": HTTP_CACHE_MB, "Default/Code Cache": CODE_CACHE_MB}
+PROFILE_PURGE = ("Default/Service Worker", "Default/Media Cache", "Default/GPUCache",
+                 "Default/DawnCache", "Default/DawnGraphiteCache", "Default/DawnWebGPUCache",
+                 "ShaderCache", "GrShaderCache", "GraphiteDawnCache", "Crashpad/reports",
+                 "Crashpad/completed", "Crashpad/pending")
+# The shared browser's throwaway profiles, which Playwright removes only on a clean close
+TEMP_PROFILE_GLOB = "playwright_chromiumdev_profile-*"
+TEMP_PROFILE_AGE  = 3600   # seconds; a younger one may be another run's, still starting
+
+
+class LaunchedProcesses:
+    """Driver/browser processes this app started, and nothing else.
+
+    Every launch is bracketed by a snapshot of our child processes, so the
+    new ones are ours by construction. The list is written to PID_FILE so the
+    next run can reap what a crashed run left behind.
+    """
+
+    def __init__(self, pid_file=PID_FILE):
+        self.pid_file = pid_file
+        self.procs    = {}   # pid -> create_time
+
+    @staticmethod
+    def _children():
+        import psutil
+        return {p.pid: p for p in psutil.Process().children(recursive=True)}
+
+    async def launch(self, coro):
+        import psutil
+        before = set(self._children())
+        result = await coro
+        for pid, p in self._children().items():
+            if pid not in before:
+                try:
+                    self.procs[pid] = p.create_time()
+                except psutil.Error:
+                    pass
+        self._save()
+        return result
+
+    def _alive(self):
+        import psutil
+        for pid, created in list(self.procs.items()):
+            try:
+                p = psutil.Process(pid)
+                if p.create_time() == created:
+                    yield p
+                    continue
+            except psutil.Error:
+                pass
+            self.procs.pop(pid, None)
+
+    def tree(self):
+        """Our processes plus everything they have spawned since (renderers, GPU, …)."""
+        import psutil
+        seen = {}
+        for p in self._alive():
+            seen[p.pid] = p
+            try:
+                for c in p.children(recursive=True):
+                    seen[c.pid] = c
+            except psutil.Error:
+                pass
+        return list(seen.values())
+
+    def rss(self):
+        """(total resident bytes, process count) across the whole tree."""
+        import psutil
+        total, procs = 0, self.tree()
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total, len(procs)
+
+    def terminate(self, timeout=3):
+        import psutil
+        procs = self.tree()
+        for p in procs:
+            try:
+                p.terminate()
+            except psutil.Error:
+                pass
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+        for p in alive:
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+        self.procs.clear()
+        self._save()
+
+    def _save(self):
+        try:
+            self.pid_file.write_text(json.dumps(self.procs))
+        except Exception as e:
+            dbg("pid file write failed:", e)
+
+    @classmethod
+    def reap_orphans(cls, pid_file=PID_FILE):
+        """Terminate processes a previous run launched and never cleaned up."""
+        try:
+            recorded = {int(k): v for k, v in json.loads(pid_file.read_text()).items()}
+        except Exception:
+            return
+        stale = cls(pid_file)
+        stale.procs = recorded
+        procs = stale.tree()
+        if procs:
+            dbg(f"Reaping {len(procs)} browser processes from a previous run")
+        stale.terminate()
+
+
+def dir_size(path):
+    """Bytes under path, not following links; 0 if it doesn't exist."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ProfileJanitor:
+    """Keeps a persistent Edge profile small enough to launch quickly.
+
+    trim() runs before launch: service-worker, media, GPU/shader caches and
+    crash dumps are purged outright, and the HTTP and code caches are wiped
+    once they pass their caps. The sign-in survives. launched() logs launch
+    time and profile size next to the previous launch's, from profile_stats.json.
+    sweep_temp() does the shared browser's part: its profile is a temp dir
+    that only outlives a crashed run. All three block; run them off the loop.
+    """
+
+    def __init__(self, path, purge=PROFILE_PURGE, caps=PROFILE_CAPS):
+        self.path       = path
+        self.purge      = purge
+        self.caps       = caps
+        self.stats_file = path / "profile_stats.json"
+        self.size       = None   # bytes, after the last trim()
+
+    @staticmethod
+    def launch_args():
+        return [f"--disk-cache-size={HTTP_CACHE_MB << 20}"]
+
+    def _in_use(self):
+        # Windows: a running browser holds "lockfile" open without sharing
+        lockfile = self.path / "lockfile"
+        if lockfile.exists():
+            try:
+                with open(lockfile, "a"):
+                    pass
+            except PermissionError:
+                return True
+            except OSError:
+                pass
+        # POSIX: the lock is a symlink to "<host>-<pid>"; stale after a crash
+        lock = self.path / "SingletonLock"
+        if not os.path.lexists(lock):
+            return False
+        import psutil
+        try:
+            return psutil.pid_exists(int(os.readlink(lock).rsplit("-", 1)[1]))
+        except (OSError, ValueError, IndexError):
+            return False
+
+    def _drop(self, rel):
+        target = self.path / rel
+        size = dir_size(target)
+        if size:
+            shutil.rmtree(target, ignore_errors=True)
+            size -= dir_size(target)
+        return size
+
+    def trim(self):
+        if self._in_use():
+            dbg(f"{self.path.name} profile is open elsewhere; not trimmed")
+            return
+        before = dir_size(self.path)
+        freed  = {rel: self._drop(rel) for rel in self.purge}
+        for rel, cap in self.caps.items():
+            if dir_size(self.path / rel) > cap << 20:
+                freed[rel] = self._drop(rel)
+        freed = {rel: n for rel, n in freed.items() if n}
+        self.size = before - sum(freed.values())
+        dbg(f"{self.path.name} profile {before >> 20} MB → {self.size >> 20} MB"
+            + ("; dropped " + ", ".join(f"{rel} {n >> 20} MB" for rel, n in freed.items())
+               if freed else ""))
+
+    @classmethod
+    def sweep_temp(cls, tmp=None, min_age=TEMP_PROFILE_AGE):
+        """Delete temp profiles that killed shared-browser runs left behind."""
+        freed, n = 0, 0
+        for path in Path(tmp or tempfile.gettempdir()).glob(TEMP_PROFILE_GLOB):
+            try:
+                if time.time() - path.stat().st_mtime < min_age or cls(path)._in_use():
+                    continue
+            except OSError:
+                continue
+            size = dir_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            if not path.exists():
+                freed += size; n += 1
+        if n:
+            dbg(f"Removed {n} stale browser temp profiles, {freed >> 20} MB")
+
+    def launched(self, seconds):
+        try:
+            last = json.loads(self.stats_file.read_text())
+        except Exception:
+            last = None
+        size = self.size if self.size is not None else dir_size(self.path)
+        try:
+            self.stats_file.write_text(json.dumps(
+                {"launch_s": round(seconds, 2), "size_mb": size >> 20, "at": time.time()}))
+        except Exception as e:
+            dbg("profile stats write failed:", e)
+        dbg(f"{self.path.name} profile launched in {seconds:.1f} s at {size >> 20} MB"
+            + (f" (last launch {last['launch_s']:.1f} s at {last['size_mb']} MB)" if last else ""))
+
+
+class SharedBrowser:
+    """One Playwright driver and one Edge process for every StreamManager.
+
+    Launched on first use; each manager attaches its own isolated context.
+    """
+
+    def __init__(self, channel="msedge", headless=False, args=None):
+        self.channel   = channel
+        self.headless  = headless
+        self.args      = args or []
+        self.processes = LaunchedProcesses()
+        self._pw       = None
+        self._browser  = None
+        self._swept    = False   # stale temp profiles cleared before the first launch
+        self._lock     = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                from playwright.async_api import async_playwright
+                if not self._swept:
+                    await asyncio.to_thread(ProfileJanitor.sweep_temp)
+                    self._swept = True
+                self._pw = await self.processes.launch(async_playwright().start())
+                t0 = time.perf_counter()
+                self._browser = await self.processes.launch(
+                    self._pw.chromium.launch(channel=self.channel, headless=self.headless,
+                                            args=self.args + ProfileJanitor.launch_args())
+                )
+                dbg(f"Shared browser up in {time.perf_counter() - t0:.1f} s;",
+                    await self.memory_line())
+            return self._browser
+
+    async def new_context(self, **kwargs):
+        return await (await self.get()).new_context(**kwargs)
+
+    async def memory_line(self):
+        # psutil walks the whole tree; keep it off the loop
+        rss, n = await asyncio.to_thread(self.processes.rss)
+        return f"browser RSS {rss / 2**20:.0f} MB across {n} processes"
+
+    async def close(self):
+        try:
+            if self._browser:
+                await self._browser.close()
+            if self._pw:
+                await self._pw.stop()
+        finally:
+            self._browser = self._pw = None
+            self.processes.terminate()
+
+
+class MemoryWatchdog:
+    """Keeps the browser's process tree under an RSS budget.
+
+    Every interval the tree's resident memory is sampled off the loop. Over
+    budget, managers are renewed (the current game reopened in a new page,
+    audio handed over, the old page closed) biggest JS heap first, until the
+    tree is back under. If renewing pages wasn't enough last time, the next
+    round renews whole contexts. Memory before and after is logged each time.
+    """
+
+    def __init__(self, browser, managers, budget_mb, interval=MEMORY_CHECK_INTERVAL):
+        self.browser   = browser
+        self.managers  = managers
+        self.budget    = budget_mb * 2**20
+        self.interval  = interval
+        self.renewals  = 0
+        self._contexts = False   # escalate to fresh contexts on the next round
+        self._task     = None
+
+    def start(self):
+        if self.budget > 0 and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                dbg("memory watchdog error:", e)
+
+    async def _sample(self):
+        # psutil walks the whole tree; keep it off the loop
+        return await asyncio.to_thread(self.browser.processes.rss)
+
+    async def check(self):
+        rss, n = await self._sample()
+        if rss <= self.budget:
+            self._contexts = False
+            return
+        fresh = self._contexts
+        dbg(f"Browser RSS {rss / 2**20:.0f} MB across {n} processes, over the "
+            f"{self.budget / 2**20:.0f} MB budget; renewing {'contexts' if fresh else 'pages'}")
+        heaps = [(await m.js_heap(), m) for m in self.managers]
+        for _, mgr in sorted(heaps, key=lambda h: -h[0]):
+            before = rss
+            # its own task, so a switch cancelling the renewal doesn't stop the watchdog
+            task = asyncio.ensure_future(mgr.renew(fresh_context=fresh))
+            with tracer.span("renew", league=mgr.dir.name.upper()):
+                await asyncio.wait([task])
+            if task.cancelled():
+                dbg(f"{mgr.dir.name} renewal cut short by a switch")
+                continue
+            if task.exception():
+                dbg(f"{mgr.dir.name} renewal failed:", task.exception())
+                continue
+            if not task.result():
+                continue
+            self.renewals += 1
+            await asyncio.sleep(RENEW_SETTLE)
+            rss, n = await self._sample()
+            dbg(f"{mgr.dir.name} renewed: browser RSS {before / 2**20:.0f} → "
+                f"{rss / 2**20:.0f} MB ({n} processes)")
+            if rss <= self.budget:
+                self._contexts = False
+                return
+        self._contexts = True
@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR    = Path.home() / "mlb_app_data"
+BASE_DIR.mkdir(exist_ok=True)
+PROJECT_DIR = Path(__file__).parent
+
+
+def dbg(*args, **kwargs):
+    print("[DEBUG]", *args, **kwargs)
+
+
+class StageTimer:
+    """Wall-clock offsets of startup stages, measured from construction."""
+
+    def __init__(self):
+        self.t0     = time.perf_counter()
+        self.stages = []   # (name, start, end) in seconds since t0
+
+    def mark(self, name):
+        t = time.perf_counter() - self.t0
+        self.stages.append((name, t, t))
+
+    @contextmanager
+    def span(self, name):
+        # a plain context manager is fine around awaits, too
+        start = time.perf_counter() - self.t0
+        try:
+            yield
+        finally:
+            self.stages.append((name, start, time.perf_counter() - self.t0))
+
+    def report(self):
+        dbg("Startup stages:")
+        for name, start, end in sorted(self.stages, key=lambda s: s[1]):
+            took = f"{(end - start) * 1000:6.0f} ms" if end > start else "        "
+            dbg(f"  {start * 1000:7.0f} ms  {took}  {name}")
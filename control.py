@@ -0,0 +1,252 @@
+"""Local control API for the game cycler.
+
+    GET  /status              current game, slate, mute state
+    POST /command/<name>      next, previous, next_league, replay, next_feed, rundown,
+                              select {"key": "MLB:745001"}, mute {"muted": true}
+    GET  /events              WebSocket: a status snapshot, then every event;
+                              {"cmd": "<name>", ...args} messages run commands
+
+Binds to 127.0.0.1 unless told otherwise. With SS_CONTROL_TOKEN set, every
+request needs "Authorization: Bearer <token>" or ?token=<token>. Requests a
+browser makes on behalf of another site (any foreign Origin header) are
+refused, token or not.
+"""
+import asyncio
+import hmac
+import importlib
+import inspect
+import json
+import os
+
+from common import dbg
+
+CONTROL_HOST  = "127.0.0.1"
+CONTROL_PORT  = 8766
+CONTROL_TOKEN = os.environ.get("SS_CONTROL_TOKEN")
+RECONNECT_MAX = 5   # seconds between a client's reconnect attempts, at most
+
+
+def check_command(cycler, name, args):
+    """Why name(**args) can't run on cycler (no such command, or arguments
+    it doesn't take), or None if it can. Checked before dispatch, so a
+    TypeError from inside a command is a bug, not a client error."""
+    try:
+        fn = getattr(cycler, cycler.COMMANDS[name])
+    except KeyError:
+        return f"unknown command {name!r}"
+    try:
+        inspect.signature(fn).bind(**args)
+    except TypeError:
+        return f"bad arguments for {name}"
+    return None
+
+
+class ControlServer:
+    """aiohttp front end for a GameCycler running on the same loop."""
+
+    def __init__(self, cycler, host=CONTROL_HOST, port=CONTROL_PORT, token=CONTROL_TOKEN):
+        self.cycler  = cycler
+        self.host    = host
+        self.port    = port
+        self.token   = token
+        self._runner = None
+        self._ws     = set()
+
+    @staticmethod
+    def _same_origin(request):
+        # browsers send Origin on WebSocket upgrades and cross-site POSTs;
+        # our own clients don't send one at all
+        origin = request.headers.get("Origin")
+        return origin is None or origin.split("://", 1)[-1] == request.host
+
+    def _authorized(self, request):
+        if not self.token:
+            return True
+        given = request.query.get("token") or \
+            request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return hmac.compare_digest(given.encode(), self.token.encode())
+
+    async def start(self):
+        # aiohttp takes a few hundred ms to import; not on the loop
+        web = await asyncio.to_thread(importlib.import_module, "aiohttp.web")
+
+        @web.middleware
+        async def auth(request, handler):
+            if not self._same_origin(request):
+                raise web.HTTPForbidden()
+            if not self._authorized(request):
+                raise web.HTTPUnauthorized()
+            return await handler(request)
+
+        app = web.Application(middlewares=[auth])
+        app.router.add_get("/status", self._status)
+        app.router.add_post("/command/{name}", self._command)
+        app.router.add_get("/events", self._events)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        dbg(f"Control API on http://{self.host}:{self.port}/status")
+
+    async def close(self):
+        for ws in list(self._ws):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _run(self, name, args):
+        """Run a command; returns the client's error string, or None on success.
+
+        Anything else a command raises propagates (a 500 over HTTP).
+        """
+        error = check_command(self.cycler, name, args)
+        if error:
+            return error
+        try:
+            self.cycler.command(name, **args)
+        except ValueError as e:   # e.g. select with a key that's not on the slate
+            return str(e)
+        return None
+
+    async def _status(self, request):
+        from aiohttp import web
+        return web.json_response(self.cycler.status())
+
+    async def _command(self, request):
+        from aiohttp import web
+        try:
+            args = await request.json() if request.can_read_body else {}
+        except ValueError:
+            return web.json_response({"error": "body must be a JSON object"}, status=400)
+        error = self._run(request.match_info["name"], args if isinstance(args, dict) else {})
+        if error:
+            return web.json_response({"error": error}, status=400)
+        return web.json_response(self.cycler.status())
+
+    async def _events(self, request):
+        from aiohttp import WSMsgType, web
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self._ws.add(ws)
+        queue = self.cycler.subscribe()
+
+        async def pump():
+            while True:
+                await ws.send_json(await queue.get())
+
+        sender = asyncio.ensure_future(pump())
+        try:
+            await ws.send_json({"type": "status", **self.cycler.status()})
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    args = json.loads(msg.data)
+                    name = args.pop("cmd")
+                except (ValueError, KeyError, AttributeError):
+                    await ws.send_json({"type": "error", "error": "expected {\"cmd\": …}"})
+                    continue
+                try:
+                    error = self._run(name, args)
+                except Exception as e:
+                    dbg(f"Command {name!r} failed:", repr(e))
+                    error = f"{name} failed"
+                if error:
+                    await ws.send_json({"type": "error", "error": error})
+        finally:
+            sender.cancel()
+            self.cycler.unsubscribe(queue)
+            self._ws.discard(ws)
+        return ws
+
+
+class LocalClient:
+    """ControlClient's interface over a GameCycler in this process: no socket.
+
+    The in-process window uses this, so it works whether or not the control
+    port could be bound. start(), send() and close() run on the loop.
+    """
+
+    def __init__(self, cycler, on_event):
+        self.cycler   = cycler
+        self.on_event = on_event
+        self._queue   = None
+        self._task    = None
+
+    def start(self):
+        self._queue = self.cycler.subscribe()
+        self.on_event({"type": "status", **self.cycler.status()})
+        self._task  = asyncio.ensure_future(self._pump())
+
+    async def _pump(self):
+        while True:
+            self.on_event(await self._queue.get())
+
+    async def send(self, cmd, **args):
+        error = check_command(self.cycler, cmd, args)
+        if error:
+            dbg(f"Command {cmd!r} rejected:", error)
+            return
+        try:
+            self.cycler.command(cmd, **args)
+        except ValueError as e:
+            dbg(f"Command {cmd!r} rejected:", e)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._queue:
+            self.cycler.unsubscribe(self._queue)
+            self._queue = None
+
+
+class ControlClient:
+    """WebSocket client of a ControlServer; reconnects until closed.
+
+    on_event(event) is called on the loop for every event, including a
+    {"type": "disconnected"} whenever the connection drops. send() is a
+    no-op while disconnected.
+    """
+
+    def __init__(self, url, on_event, token=CONTROL_TOKEN):
+        self.url      = url.rstrip("/")
+        self.on_event = on_event
+        self.token    = token
+        self._ws      = None
+        self._task    = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def send(self, cmd, **args):
+        if self._ws is None or self._ws.closed:
+            dbg(f"Not connected to {self.url}; dropped {cmd!r}")
+            return
+        await self._ws.send_json({"cmd": cmd, **args})
+
+    async def _run(self):
+        aiohttp = await asyncio.to_thread(importlib.import_module, "aiohttp")
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else None
+        delay = 0.25
+        async with aiohttp.ClientSession(headers=headers) as session:
+            while True:
+                try:
+                    async with session.ws_connect(f"{self.url}/events", heartbeat=30) as ws:
+                        self._ws, delay = ws, 0.25
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self.on_event(json.loads(msg.data))
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                self._ws = None
+                self.on_event({"type": "disconnected"})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
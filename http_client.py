@@ -0,0 +1,139 @@
+import asyncio
+import json
+import re
+import time
+
+from common import dbg
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class HttpClient:
+    """One long-lived, pooled aiohttp session shared by every scoreboard fetch.
+
+    Keeps connections alive between fetches, remembers ETag/Last-Modified per
+    URL so unchanged payloads come back as 304s, and retries transient
+    failures with exponential backoff.
+    """
+
+    def __init__(self, timeout=10, retries=3, backoff=0.5, limit_per_host=4):
+        self.timeout        = timeout
+        self.retries        = retries
+        self.backoff        = backoff
+        self.limit_per_host = limit_per_host
+        self._session       = None
+        self._cache         = {}   # url -> {"etag", "modified", "expires", "body", "data"}
+        self.stats          = {"hit": 0, "miss": 0, "not_modified": 0,
+                               "retry": 0, "error": 0, "bytes_in": 0, "bytes_saved": 0}
+
+    def _get_session(self):
+        import aiohttp
+        # created lazily so the session binds to whichever loop first uses it
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+        return self._session
+
+    async def get_json(self, url, timeout=None):
+        """GET url and return the decoded JSON, revalidating any cached copy."""
+        return (await self.fetch(url, timeout))[0]
+
+    async def fetch(self, url, timeout=None, cache=True):
+        """GET url → (decoded JSON, bytes downloaded; 0 if served from cache or a 304).
+
+        cache=False skips the validator cache entirely, for one-off URLs such
+        as delta feeds keyed by a timecode.
+        """
+        import aiohttp
+        entry = self._cache.get(url) if cache else None
+
+        # still fresh per Cache-Control: no network at all
+        if entry and entry["expires"] > time.monotonic():
+            self.stats["hit"] += 1
+            self.stats["bytes_saved"] += len(entry["body"])
+            return entry["data"], 0
+
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["modified"]:
+                headers["If-Modified-Since"] = entry["modified"]
+
+        req_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._get_session().get(url, headers=headers, timeout=req_timeout) as r:
+                    if r.status == 304 and entry:
+                        self.stats["not_modified"] += 1
+                        self.stats["bytes_saved"] += len(entry["body"])
+                        entry["expires"] = self._expires(r.headers)
+                        return entry["data"], 0
+                    if r.status == 304:
+                        # nothing cached to answer with (an intermediate cache's 304?)
+                        raise aiohttp.ClientResponseError(
+                            r.request_info, r.history, status=304,
+                            message="Not Modified, but there is no cached copy"
+                        )
+                    if r.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            r.request_info, r.history, status=r.status, message=r.reason or ""
+                        )
+                    r.raise_for_status()
+                    body = await r.read()
+                    data = json.loads(body)
+                    if cache:
+                        self._cache[url] = {
+                            "etag":     r.headers.get("ETag"),
+                            "modified": r.headers.get("Last-Modified"),
+                            "expires":  self._expires(r.headers),
+                            "body":     body,
+                            "data":     data,
+                        }
+                    self.stats["miss"] += 1
+                    self.stats["bytes_in"] += len(body)
+                    return data, len(body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retriable = not isinstance(e, aiohttp.ClientResponseError) or e.status >= 500
+                if isinstance(e, aiohttp.ClientResponseError) and e.status == 304:
+                    # ask once more, for the full body past any cache on the way
+                    retriable = "Cache-Control" not in headers
+                    headers   = {"Cache-Control": "no-cache"}
+                if not retriable or attempt == self.retries:
+                    self.stats["error"] += 1
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                self.stats["retry"] += 1
+                dbg(f"GET {url} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def cached_size(self, url):
+        """Size of the body cached for url, or 0."""
+        entry = self._cache.get(url)
+        return len(entry["body"]) if entry else 0
+
+    def forget(self, url):
+        self._cache.pop(url, None)
+
+    @staticmethod
+    def _expires(headers):
+        m = MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+        return time.monotonic() + (int(m.group(1)) if m else 0)
+
+    def stats_line(self):
+        s = self.stats
+        return (f"hit={s['hit']} miss={s['miss']} 304={s['not_modified']} "
+                f"retry={s['retry']} error={s['error']} in={s['bytes_in'] // 1024}KB "
+                f"saved={s['bytes_saved'] // 1024}KB")
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,275 @@
+from datetime import datetime, timedelta
+from enum import IntEnum
+
+STREAM_LEAD   = timedelta(minutes=45)   # open a scheduled game's stream this early
+ADJACENT_LEAD = timedelta(hours=2)      # yesterday's/tomorrow's games this close to start join the slate
+RECENT_FINAL  = timedelta(hours=6)      # finals that started this recently still make the rundown
+
+
+class Status(IntEnum):
+    # values double as the within-league sort order
+    LIVE      = 0
+    FINAL     = 1
+    SCHEDULED = 2
+
+
+class Game:
+    """One game, normalized once from a league payload.
+
+    Everything the UI, sorting and stream logic need is a plain field read;
+    the spoken lines are built here rather than on every render.
+    """
+
+    __slots__ = ("league", "id", "date", "status", "status_text", "start",
+                 "away_name", "home_name", "away_code", "home_code",
+                 "away_score", "home_score",
+                 "match", "status_line", "score_line", "stream_url")
+
+    def __init__(self, league, id, date, status, status_text, start,
+                 away_name, home_name, away_code, home_code,
+                 away_score, home_score, match, status_line, stream_url):
+        self.league      = league
+        self.id          = id
+        self.date        = date          # schedule date (YYYY-MM-DD) the league files it under
+        self.status      = status
+        self.status_text = status_text
+        self.start       = start
+        self.away_name   = away_name
+        self.home_name   = home_name
+        self.away_code   = away_code
+        self.home_code   = home_code
+        self.away_score  = away_score
+        self.home_score  = home_score
+        self.match       = match
+        self.status_line = status_line
+        self.stream_url  = stream_url
+        self.score_line  = "" if status == Status.SCHEDULED else self._score_line()
+
+    def _score_line(self):
+        # leader first; ties read home first
+        if self.home_score >= self.away_score:
+            return f"{self.home_name} {self.home_score}, {self.away_name} {self.away_score}"
+        return f"{self.away_name} {self.away_score}, {self.home_name} {self.home_score}"
+
+    @property
+    def key(self):
+        return (self.league, self.id)
+
+    def fingerprint(self):
+        """The fields the UI shows; a game counts as changed only if these move."""
+        return (self.status, self.status_text, self.away_score, self.home_score)
+
+    def should_stream(self, now=None):
+        if self.status == Status.LIVE:
+            return True
+        if self.status == Status.SCHEDULED and self.start:
+            now = now or datetime.now().astimezone()
+            return now >= self.start - STREAM_LEAD
+        return False
+
+    def replace(self, **changes):
+        """Copy with fields changed; the score line is rebuilt to match."""
+        fields = {k: getattr(self, k) for k in self.__slots__ if k != "score_line"}
+        return Game(**{**fields, **changes})
+
+    def as_dict(self):
+        """JSON-ready fields, for the control API; "key" is "LEAGUE:id"."""
+        return {
+            "key": f"{self.league}:{self.id}", "league": self.league, "id": self.id,
+            "date": self.date, "status": self.status.name.lower(), "status_text": self.status_text,
+            "start": self.start.isoformat() if self.start else None,
+            "away": self.away_name, "home": self.home_name,
+            "away_score": self.away_score, "home_score": self.home_score,
+            "match": self.match, "status_line": self.status_line, "score_line": self.score_line,
+        }
+
+    def in_slate(self, today, now=None):
+        """Today's games, plus adjacent-day games that are live or about to start."""
+        if self.date == today or self.status == Status.LIVE:
+            return True
+        if self.status == Status.SCHEDULED and self.start:
+            now = now or datetime.now().astimezone()
+            return abs(self.start - now) <= ADJACENT_LEAD
+        return False
+
+    def __repr__(self):
+        return f"<Game {self.league} {self.id} {self.status.name}>"
+
+
+def rundown(league, games, now=None):
+    """One spoken paragraph covering league's live and recently final games, or ""."""
+    now   = now or datetime.now().astimezone()
+    items = [g for g in games
+             if g.status == Status.LIVE
+             or (g.status == Status.FINAL and (not g.start or now - g.start <= RECENT_FINAL))]
+    if not items:
+        return ""
+    items.sort(key=lambda g: (g.status, g.start or now))
+    parts = [f"{g.score_line}, {'final' if g.status == Status.FINAL else g.status_line}"
+             for g in items]
+    return f"{league}. " + ". ".join(parts) + "."
+
+
+def parse_iso(dt_str):
+    """ISO-8601 (with trailing Z) → aware local datetime, or None."""
+    if not dt_str:
+        return None
+    try:
+        return datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
+    except Exception:
+        return None
+
+
+def parse_nba_status(raw: str) -> str:
+    raw = (raw or "").strip()
+    if raw.lower().startswith("end of"):
+        parts = raw.split()
+        if len(parts) >= 3:
+            num = parts[-2]
+            qm = {"1st":"1st quarter","2nd":"2nd quarter",
+                  "3rd":"3rd quarter","4th":"4th quarter"}
+            return f"End of the {qm.get(num,num)}"
+        return raw
+    if raw.startswith("Q") and " " in raw:
+        q, tm = raw.split(" ",1)
+        qm = {"Q1":"1st quarter","Q2":"2nd quarter",
+              "Q3":"3rd quarter","Q4":"4th quarter"}
+        return f"{tm} to go in the {qm.get(q,q)}"
+    return raw or "Status not available"
+
+
+class LeagueAdapter:
+    """Turns one league's scoreboard payload into Game records.
+
+    To add a league: subclass, fill in name/profile, implement
+    scoreboard_url, entries and game, and register() an instance.
+    """
+
+    name    = None   # "NBA", "MLB", …
+    profile = None   # StreamManager profile subdirectory
+    dated   = True   # False if the feed only ever serves today's slate
+    api     = None   # scoreboard host
+    site    = None   # stream/sign-in host
+
+    def scoreboard_url(self, date):
+        raise NotImplementedError
+
+    def live_url(self, game_id):
+        """Per-game live feed followed while the game is on screen; None if unsupported."""
+        return None
+
+    def entries(self, data):
+        """The raw per-game dicts in a scoreboard payload."""
+        raise NotImplementedError
+
+    def game(self, g, date):
+        """One raw game dict → Game."""
+        raise NotImplementedError
+
+    def parse(self, data, date):
+        return [self.game(g, date) for g in self.entries(data)]
+
+
+class NBAAdapter(LeagueAdapter):
+    name    = "NBA"
+    profile = "nba"
+    dated   = False
+    api     = "https://cdn.nba.com"
+    site    = "https://www.nba.com"
+
+    def scoreboard_url(self, date):
+        # the CDN only serves "today"; date just keys the snapshot
+        return f"{self.api}/static/json/liveData/scoreboard/todaysScoreboard_00.json"
+
+    def live_url(self, game_id):
+        # play-by-play; grows with the game, so it's revalidated rather than diffed
+        return f"{self.api}/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+
+    def entries(self, data):
+        return data.get("scoreboard", {}).get("games", [])
+
+    def game(self, g, date):
+        code   = g.get("gameStatus", 1)  # 1=Scheduled, 2=Live, 3=Final
+        status = Status.LIVE if code == 2 else Status.FINAL if code == 3 else Status.SCHEDULED
+        away, home = g["awayTeam"], g["homeTeam"]
+        text   = g.get("gameStatusText", "")
+        if status == Status.SCHEDULED:
+            line = f"Starts at {text.strip()}"
+        elif status == Status.LIVE:
+            line = parse_nba_status(text)
+        else:
+            line = "Final"
+        return Game(
+            "NBA", g["gameId"], date, status, text,
+            parse_iso(g.get("gameTimeUTC") or g.get("gameDate")),
+            away["teamName"], home["teamName"], away["teamTricode"], home["teamTricode"],
+            away.get("score", 0), home.get("score", 0),
+            f"{away['teamCity']} {away['teamName']} at {home['teamCity']} {home['teamName']}",
+            line,
+            f"{self.site}/game/"
+            f"{away['teamTricode']}-vs-{home['teamTricode']}-{g['gameId']}?watch",
+        )
+
+
+class MLBAdapter(LeagueAdapter):
+    name    = "MLB"
+    profile = "mlb"
+    api     = "https://statsapi.mlb.com"
+    site    = "https://www.mlb.com"
+
+    def scoreboard_url(self, date):
+        return f"{self.api}/api/v1/schedule?sportId=1&date={date}"
+
+    def live_url(self, game_id):
+        return f"{self.api}/api/v1.1/game/{game_id}/feed/live"
+
+    def diff_url(self, game_id, timecode):
+        """JSON-patch deltas to the live feed since timecode (metaData.timeStamp)."""
+        return f"{self.live_url(game_id)}/diffPatch?startTimecode={timecode}"
+
+    def entries(self, data):
+        return [g for d in data.get("dates", []) for g in d.get("games", [])]
+
+    def game(self, g, date):
+        st     = g.get("status", {})
+        state  = st.get("abstractGameState", "Preview")
+        status = Status.SCHEDULED if state == "Preview" else Status.LIVE if state == "Live" else Status.FINAL
+        away, home = g["teams"]["away"], g["teams"]["home"]
+        start  = parse_iso(g.get("gameDate"))
+        if status == Status.SCHEDULED:
+            when = start.strftime("%I:%M %p").lstrip("0") if start \
+                else st.get("detailedState", "Scheduled")
+            line = f"Scheduled at {when}"
+        elif status == Status.LIVE:
+            line = st.get("detailedState", "Live")
+        else:
+            line = "Final"
+        return Game(
+            "MLB", g["gamePk"], g.get("officialDate", date), status, st.get("detailedState"), start,
+            away["team"]["name"], home["team"]["name"],
+            away["team"].get("abbreviation"), home["team"].get("abbreviation"),
+            away.get("score", 0), home.get("score", 0),
+            f"{away['team']['name']} at {home['team']['name']}",
+            line,
+            f"{self.site}/tv/g{g['gamePk']}",
+        )
+
+
+# registration order is game_list block order
+LEAGUES = {}
+
+
+def register(adapter):
+    LEAGUES[adapter.name] = adapter
+
+
+def point_at(base):
+    """Send every league's scoreboard and stream traffic to base, e.g. a replay server."""
+    base = base.rstrip("/")
+    for name, adapter in LEAGUES.items():
+        adapter.api  = f"{base}/{name.lower()}/api"
+        adapter.site = f"{base}/{name.lower()}/site"
+
+
+register(NBAAdapter())
+register(MLBAdapter())
@@ -0,0 +1,299 @@
+import asyncio
+import copy
+import re
+
+from common import dbg
+from leagues import LEAGUES, Status
+from tracing import tracer
+
+LIVE_INTERVAL = 8   # seconds between delta polls for the game on screen
+
+NBA_CLOCK_RE = re.compile(r"PT(\d+)M(\d+)(?:\.\d+)?S")
+
+
+def ordinal(n):
+    n = int(n)
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def nba_period(n):
+    n = int(n)
+    if n <= 4:
+        return f"{ordinal(n)} quarter"
+    return "overtime" if n == 5 else f"{ordinal(n - 4)} overtime"
+
+
+def nba_clock(raw):
+    """'PT05M12.00S' → '5:12'."""
+    m = NBA_CLOCK_RE.match(raw or "")
+    return f"{int(m.group(1))}:{m.group(2)}" if m else ""
+
+
+# — JSON Patch (RFC 6902), as served by MLB's diffPatch —
+
+def _parts(path):
+    return [p.replace("~1", "/").replace("~0", "~") for p in path.split("/")[1:]]
+
+
+def _walk(doc, parts):
+    for p in parts:
+        doc = doc[int(p)] if isinstance(doc, list) else doc[p]
+    return doc
+
+
+def _add(doc, parts, value):
+    if not parts:
+        return value
+    parent, key = _walk(doc, parts[:-1]), parts[-1]
+    if isinstance(parent, list):
+        parent.append(value) if key == "-" else parent.insert(int(key), value)
+    else:
+        parent[key] = value
+    return doc
+
+
+def _remove(doc, parts):
+    parent, key = _walk(doc, parts[:-1]), parts[-1]
+    return parent.pop(int(key) if isinstance(parent, list) else key)
+
+
+def json_patch(doc, ops):
+    """Apply ops to doc in place; returns the document (replaced if the root was)."""
+    for op in ops:
+        kind, parts = op["op"], _parts(op["path"])
+        if kind == "add":
+            doc = _add(doc, parts, op["value"])
+        elif kind == "remove":
+            _remove(doc, parts)
+        elif kind == "replace":
+            if not parts:
+                doc = op["value"]
+            else:
+                parent, key = _walk(doc, parts[:-1]), parts[-1]
+                parent[int(key) if isinstance(parent, list) else key] = op["value"]
+        elif kind == "move":
+            doc = _add(doc, parts, _remove(doc, _parts(op["from"])))
+        elif kind == "copy":
+            doc = _add(doc, parts, copy.deepcopy(_walk(doc, _parts(op["from"]))))
+        # "test" ops are advisory here
+    return doc
+
+
+class GameTracker:
+    """Follows one live game's own feed and reports what changed.
+
+    start() loads the current state without announcing its history; each
+    poll() applies only what is new and returns the lines worth speaking.
+    game() is the on-screen Game rebuilt from the tracked state.
+    """
+
+    def __init__(self, http, game):
+        self.http    = http
+        self.base    = game
+        self.adapter = LEAGUES[game.league]
+        self.final   = False
+        self.polls   = 0
+        self.bytes   = 0
+
+    async def _get(self, url, cache=True):
+        data, size = await self.http.fetch(url, cache=cache)
+        self.bytes += size
+        return data, size
+
+    async def start(self):
+        raise NotImplementedError
+
+    async def poll(self):
+        raise NotImplementedError
+
+    def game(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MLBTracker(GameTracker):
+    """MLB feed/live once, then diffPatch deltas from its metaData.timeStamp."""
+
+    async def start(self):
+        self.feed, _ = await self._get(self.adapter.live_url(self.base.id), cache=False)
+        plays = self.feed["liveData"]["plays"]["allPlays"]
+        # everything already complete is history, not news
+        self._next_play = sum(1 for p in plays if p["about"].get("isComplete"))
+        self._inning    = self._inning_key()
+
+    def _inning_key(self):
+        ls = self.feed["liveData"].get("linescore", {})
+        return ls.get("currentInning"), ls.get("inningState")
+
+    async def poll(self):
+        self.polls += 1
+        url = self.adapter.diff_url(self.base.id, self.feed["metaData"]["timeStamp"])
+        data, _ = await self._get(url, cache=False)
+        if isinstance(data, dict):
+            # too far behind for deltas: the full feed comes back instead
+            self.feed = data
+        else:
+            for patch in data:
+                self.feed = json_patch(self.feed, patch.get("diff", []))
+        return self._events()
+
+    def _events(self):
+        events, scored = [], False
+        plays = self.feed["liveData"]["plays"]["allPlays"]
+        while self._next_play < len(plays) and plays[self._next_play]["about"].get("isComplete"):
+            play = plays[self._next_play]
+            if play["about"].get("isScoringPlay"):
+                events.append(play["result"]["description"])
+                scored = True
+            self._next_play += 1
+
+        inning = self._inning_key()
+        if inning != self._inning and inning[0]:
+            self._inning = inning
+            events.append(f"{inning[1]} of the {ordinal(inning[0])}")
+
+        state = self.feed["gameData"]["status"].get("abstractGameState")
+        if state == "Final" and not self.final:
+            self.final = True
+            events.append("Final")
+        if scored or self.final:
+            events.append(self.game().score_line)
+        return events
+
+    def game(self):
+        ls    = self.feed["liveData"].get("linescore", {})
+        teams = ls.get("teams", {})
+        if self.final:
+            status, line = Status.FINAL, "Final"
+        else:
+            status = Status.LIVE
+            outs   = ls.get("outs", 0)
+            line   = (f"{ls.get('inningState', '')} of the {ordinal(ls['currentInning'])}, "
+                      f"{outs} out{'' if outs == 1 else 's'}") if ls.get("currentInning") \
+                else self.base.status_line
+        return self.base.replace(
+            status=status, status_line=line,
+            away_score=teams.get("away", {}).get("runs", self.base.away_score),
+            home_score=teams.get("home", {}).get("runs", self.base.home_score))
+
+
+class NBATracker(GameTracker):
+    """NBA play-by-play, revalidated each poll; only actions past the last
+    actionNumber are applied. The CDN has no delta feed, so bytes are saved
+    by 304s while nothing happens, not by partial bodies."""
+
+    async def start(self):
+        data, _ = await self._get(self.adapter.live_url(self.base.id))
+        actions = data["game"]["actions"]
+        self.last   = max((a["actionNumber"] for a in actions), default=0)
+        self.period = actions[-1]["period"] if actions else 1
+        self.clock  = actions[-1].get("clock", "") if actions else ""
+        self.away   = int(actions[-1].get("scoreAway", 0)) if actions else 0
+        self.home   = int(actions[-1].get("scoreHome", 0)) if actions else 0
+
+    async def poll(self):
+        self.polls += 1
+        data, size = await self._get(self.adapter.live_url(self.base.id))
+        if not size:
+            return []   # 304: nothing new
+        events, scored = [], False
+        for a in data["game"]["actions"]:
+            if a["actionNumber"] <= self.last:
+                continue
+            self.last   = a["actionNumber"]
+            self.period = a.get("period", self.period)
+            self.clock  = a.get("clock", self.clock)
+            kind, sub   = a.get("actionType"), a.get("subType")
+            if kind == "period":
+                events.append(f"{'Start' if sub == 'start' else 'End'} of the {nba_period(self.period)}")
+            elif kind == "game" and sub == "end":
+                self.final = True
+                events.append("Final")
+            away, home = int(a.get("scoreAway", self.away)), int(a.get("scoreHome", self.home))
+            if (away, home) != (self.away, self.home):
+                self.away, self.home, scored = away, home, True
+                if a.get("description"):
+                    events.append(a["description"])
+        if scored or self.final:
+            events.append(self.game().score_line)
+        return events
+
+    def game(self):
+        if self.final:
+            status, line = Status.FINAL, "Final"
+        else:
+            status = Status.LIVE
+            clock  = nba_clock(self.clock)
+            line   = f"{clock} to go in the {nba_period(self.period)}" if clock \
+                else f"{nba_period(self.period).capitalize()}"
+        return self.base.replace(status=status, status_line=line,
+                                 away_score=self.away, home_score=self.home)
+
+    def close(self):
+        # the play-by-play body is big; don't keep it cached once we stop following
+        self.http.forget(self.adapter.live_url(self.base.id))
+
+
+TRACKERS = {"MLB": MLBTracker, "NBA": NBATracker}
+
+
+class LiveTracker:
+    """Follows the game on screen, if it is live, through its own feed.
+
+    on_update(game, events) runs on the loop with the refreshed Game and the
+    lines to announce (scoring plays, inning/period changes, final); it is
+    called only when something changed.
+    """
+
+    def __init__(self, http, on_update, interval=LIVE_INTERVAL):
+        self.http      = http
+        self.on_update = on_update
+        self.interval  = interval
+        self.key       = None
+        self._task     = None
+
+    def follow(self, game):
+        """Switch to game (loop thread); stops following if it isn't live."""
+        if self.key == game.key and self._task and not self._task.done():
+            return
+        self.stop()
+        cls = TRACKERS.get(game.league)
+        if cls is None or game.status != Status.LIVE or not LEAGUES[game.league].live_url(game.id):
+            return
+        self.key   = game.key
+        self._task = asyncio.ensure_future(self._run(cls(self.http, game)))
+
+    def following(self, key):
+        return self.key == key and self._task is not None and not self._task.done()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        self._task = self.key = None
+
+    async def _run(self, tracker):
+        g = tracker.base
+        try:
+            with tracer.span("live.start", league=g.league, game=g.id):
+                await tracker.start()
+            while not tracker.final:
+                await asyncio.sleep(self.interval)
+                try:
+                    with tracer.span("live.poll", league=g.league, game=g.id):
+                        events = await tracker.poll()
+                except Exception as e:
+                    dbg(f"{g.league} {g.id} live poll error:", e)
+                    continue
+                if events:
+                    self.on_update(tracker.game(), events)
+        except Exception as e:
+            dbg(f"{g.league} {g.id} live tracking stopped:", e)
+        finally:
+            tracker.close()
+            board = self.http.cached_size(LEAGUES[g.league].scoreboard_url(g.date))
+            dbg(f"{g.league} {g.id} live: {tracker.polls} polls, {tracker.bytes // 1024} KB"
+                + (f" (scoreboard refetches would be ~{board * tracker.polls // 1024} KB)"
+                   if board else ""))
@@ -1,41 +1,114 @@
+import argparse
 import asyncio
 import json
-import tkinter as tk
-from tkinter import ttk
-import aiohttp
-from playwright.async_api import async_playwright
-from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+import os
+import signal
 import threading
-import psutil
-from gtts import gTTS
-import pygame
 import time
-from datetime import datetime, timedelta
-from pathlib import Path
-import uuid
-import atexit
-import shutil
-
-BASE_DIR    = Path.home() / "mlb_app_data"
-BASE_DIR.mkdir(exist_ok=True)
-PROJECT_DIR = Path(__file__).parent
-SPEECH_DIR  = PROJECT_DIR / "speech_mp3s"
-SPEECH_DIR.mkdir(exist_ok=True)
-
-# Clear out any leftovers from prior runs
-for old in SPEECH_DIR.glob("speech_*.mp3"):
-    try:
-        old.unlink()
-    except:
-        pass
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from audio_only import PageBlocker
+from bridge import LoopBridge
+from browser import LaunchedProcesses, MemoryWatchdog, ProfileJanitor, SharedBrowser
+from common import BASE_DIR, StageTimer, dbg
+from control import CONTROL_HOST, CONTROL_PORT, ControlClient, ControlServer, LocalClient
+from http_client import HttpClient
+from leagues import LEAGUES, point_at, rundown
+from live import LiveTracker
+from recipes import RecipeBook
+from schedule_store import SCHEDULE_DB, ScheduleStore
+from scoreboard import ScoreboardCache, ScoreboardPoller
+from tracing import tracer
+from tts import FIXED_PROMPTS, AudioScheduler, prefetcher, speech_cache
+
+
+# (kind, id) → action. Axis ids are (axis, direction); hat ids are (x, y).
+# Override per box with ~/mlb_app_data/controller.json, e.g.
+#   {"button:0": "next", "hat:0,1": "next_league", "axis:1,-1": "replay"}
+CONTROLLER_MAP = {
+    ("button", 0):    "next",
+    ("button", 1):    "previous",
+    ("button", 2):    "next_league",
+    ("button", 3):    "replay",
+    ("hat", (1, 0)):  "next",
+    ("hat", (-1, 0)): "previous",
+    ("hat", (0, 1)):  "next_league",
+    ("hat", (0, -1)): "replay",
+    ("axis", (0, 1)): "next",
+    ("axis", (0, -1)): "previous",
+}
+UNMAPPED_BUTTON_ACTION = "next"   # any other button still cycles, as before
+CONTROLLER_ACTIONS     = ("next", "previous", "next_league", "replay", "next_feed", "rundown")
+AXIS_DEADZONE          = 0.5
+ACTION_MIN_INTERVAL    = 0.35     # seconds between two actions from the pad
+
+
+def load_controller_map(path=BASE_DIR / "controller.json"):
+    mapping = dict(CONTROLLER_MAP)
+    if path.exists():
+        try:
+            for k, action in json.loads(path.read_text()).items():
+                kind, _, ident = k.partition(":")
+                nums = tuple(int(x) for x in ident.split(","))
+                mapping[(kind, nums[0] if kind == "button" else nums)] = action
+        except Exception as e:
+            print("controller.json ignored:", e)
+    return mapping
+
+
+class InputFilter:
+    """Turns raw joystick events into at most one action per physical gesture.
+
+    Axes fire on the edge where they leave the deadzone and re-arm only after
+    returning to it; hats fire on press, not release; everything passes a
+    global rate limit.
+    """
+
+    def __init__(self, mapping, deadzone=AXIS_DEADZONE, min_interval=ACTION_MIN_INTERVAL):
+        self.mapping      = mapping
+        self.deadzone     = deadzone
+        self.min_interval = min_interval
+        self._axis_dir    = {}    # axis → -1 / 0 / 1 last reported direction
+        self._last_fire   = float("-inf")
+
+    def action_for(self, ev, now=None):
+        import pygame
+        if ev.type == pygame.JOYBUTTONDOWN:
+            action = self.mapping.get(("button", ev.button), UNMAPPED_BUTTON_ACTION)
+        elif ev.type == pygame.JOYHATMOTION:
+            if ev.value == (0, 0):
+                return None
+            action = self.mapping.get(("hat", tuple(ev.value)))
+        elif ev.type == pygame.JOYAXISMOTION:
+            d = 0 if abs(ev.value) < self.deadzone else (1 if ev.value > 0 else -1)
+            prev = self._axis_dir.get(ev.axis, 0)
+            self._axis_dir[ev.axis] = d
+            if d == 0 or d == prev:
+                return None
+            action = self.mapping.get(("axis", (ev.axis, d)))
+        else:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if action is None or now - self._last_fire < self.min_interval:
+            return None
+        self._last_fire = now
+        return action
 
-# Register end-of-program cleanup
-atexit.register(lambda: shutil.rmtree(SPEECH_DIR, ignore_errors=True))
 
+# SDL subsystem init isn't thread-safe; the mixer (I/O pool) and the
+# controller thread take turns
+SDL_INIT_LOCK = threading.Lock()
 
-def controller_loop(app):
-    pygame.init()
-    pygame.joystick.init()
+
+def controller_loop(send):
+    """Joystick → send(action) for every mapped gesture; send must be thread-safe."""
+    import pygame
+    with SDL_INIT_LOCK:
+        # only what joystick events need; the mixer is _init_audio's
+        pygame.display.init()
+        pygame.joystick.init()
     if pygame.joystick.get_count() == 0:
         print("No controller found!")
         return
@@ -43,91 +116,375 @@ def controller_loop(app):
     js.init()
     print("Controller initialized:", js.get_name())
 
+    # only joystick events wake us up
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.JOYBUTTONDOWN, pygame.JOYAXISMOTION, pygame.JOYHATMOTION])
+
+    filt = InputFilter(load_controller_map())
     while True:
-        for ev in pygame.event.get():
-            # any button press, any axis movement, any hat motion → next game
-            if ev.type == pygame.JOYBUTTONDOWN \
-                    or ev.type == pygame.JOYAXISMOTION \
-                    or ev.type == pygame.JOYHATMOTION:
-                app.root.after(0, app.next_game)
-        time.sleep(0.01)
-
-
-def dbg(*args, **kwargs):
-    print("[DEBUG]", *args, **kwargs)
-
-def parse_nba_status(raw: str) -> str:
-    raw = (raw or "").strip()
-    if raw.lower().startswith("end of"):
-        parts = raw.split()
-        if len(parts) >= 3:
-            num = parts[-2]
-            qm = {"1st":"1st quarter","2nd":"2nd quarter",
-                  "3rd":"3rd quarter","4th":"4th quarter"}
-            return f"End of the {qm.get(num,num)}"
-        return raw
-    if raw.startswith("Q") and " " in raw:
-        q, tm = raw.split(" ",1)
-        qm = {"Q1":"1st quarter","Q2":"2nd quarter",
-              "Q3":"3rd quarter","Q4":"4th quarter"}
-        return f"{tm} to go in the {qm.get(q,q)}"
-    return raw or "Status not available"
-
-def playSound(text):
-    fn = SPEECH_DIR / f"speech_{uuid.uuid4().hex}.mp3"
+        action = filt.action_for(pygame.event.wait())
+        if action in CONTROLLER_ACTIONS:
+            send(action)
+
+
+async def read_credentials(league):
+    """(user, password) from BASE_DIR/credentials-<league>.txt, read off the loop."""
+    text = await asyncio.to_thread((BASE_DIR / f"credentials-{league}.txt").read_text)
+    return tuple(text.splitlines()[:2])
+
+
+async def race_selectors(page, candidates, timeout=5000):
+    """Wait on several selectors at once and return (name, handle) of the first
+    to appear, or (None, None) if none shows up within timeout ms."""
+    tasks = {
+        asyncio.ensure_future(page.wait_for_selector(sel, timeout=timeout)): name
+        for name, sel in candidates.items()
+    }
+    pending = set(tasks)
     try:
-        gTTS(text=text, lang="en").save(str(fn))
-        pygame.mixer.music.load(str(fn))
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-    except Exception as e:
-        print("playSound error:", e)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if not t.cancelled() and t.exception() is None and t.result() is not None:
+                    return tasks[t], t.result()
+        return None, None
     finally:
-        # best effort: delete once playback is fully done
-        try:
-            fn.unlink()
-        except Exception:
-            pass
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+WARM_POOL_SIZE = 2      # pre-navigated background pages kept per manager
+AUDIO_ONLY     = False  # abort images, fonts, video renditions and trackers (unmeasured; routing turns off the HTTP cache)
+SHARED_BROWSER = True   # one Edge for both leagues; False = one persistent profile each
+RSS_BUDGET_MB  = 1536   # MB across the browser's processes before pages are renewed (0 = off)
+TRACE_OVERLAY  = False  # start with the last switch's phase breakdown shown (F2 toggles)
+RUNDOWN_MAX_AGE = 30   # seconds; the poller usually keeps live snapshots fresher than this
+CACHED_SCORE_AGE = 120  # seconds; an older cached slate's scores aren't spoken until revalidated
+REPLAY_URL     = os.environ.get("SS_REPLAY_URL")   # e.g. http://127.0.0.1:8765 from replay_server.py
+
+# Injected into every page (every frame of it): media that starts playing
+# comes up muted until unmute_page flips the flag in every frame, so a warm
+# page stays silent in the pool and a muted stream never blips on a switch.
+WARM_MUTE_JS = """
+(() => {
+    window.__ssMuted = true;
+    const play = HTMLMediaElement.prototype.play;
+    HTMLMediaElement.prototype.play = function () {
+        if (window.__ssMuted) this.muted = true;
+        return play.apply(this, arguments);
+    };
+})();
+"""
 
-def kill_edge():
-    for p in psutil.process_iter(['pid','name']):
-        if p.info['name'] and 'msedge' in p.info['name'].lower():
-            try: p.terminate()
-            except: pass
 
 class StreamManager:
-    def __init__(self, subdir):
+    def __init__(self, subdir, browser, pool_size=WARM_POOL_SIZE,
+                 audio_only=AUDIO_ONLY, shared=SHARED_BROWSER):
         self.dir   = BASE_DIR/subdir; self.dir.mkdir(exist_ok=True)
         self.ctx   = None; self.page = None
-        self.ready = asyncio.Event()
-        self._mlb_feed_index = 0
+        self.browser = browser
+        self.shared  = shared
+        self.pw      = None   # only in persistent-profile mode
+        self.url   = None
+        self.muted = False   # the current page's wanted state, kept across renewals
+        self.pool_size = pool_size
+        self._warm = {}   # url -> muted, ready-to-play page
+        self._warm_task = None
+        self._renewing  = None   # renew() task, which a switch cuts short
+        self.audio_only = audio_only
+        self.blockers   = {}   # page -> PageBlocker, while the page is open
+        self._start_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()   # a cancelled open unwinds before the next starts
+        self.recipes    = RecipeBook(self.dir / "stream_recipes.json")
+        self._game_ids  = {}   # stream url -> game id, for recipe lookups
+        self._auth_file = self.dir / "auth_state.json"
+        self._auth      = None   # cookies seen right after a confirmed sign-in
+        self._state_file = self.dir / "storage_state.json"
+        self.janitor    = ProfileJanitor(self.dir)   # persistent mode only
 
     async def start(self):
-        pw = await async_playwright().start()
-        self.ctx = await pw.chromium.launch_persistent_context(
-            str(self.dir), channel="msedge", headless=False
-        )
-        await asyncio.sleep(1)
-        self.ready.set()
+        """Attach on first use: a context in the shared browser, or (persistent
+        mode) this profile's own browser. Safe to call repeatedly."""
+        async with self._start_lock:
+            if self.ctx:
+                return
+            if self.shared:
+                # cookies + localStorage stand in for the on-disk profile
+                state = str(self._state_file) if self._state_file.exists() else None
+                self.ctx = await self.browser.new_context(storage_state=state)
+            else:
+                from playwright.async_api import async_playwright
+                procs = self.browser.processes
+                await asyncio.to_thread(self.janitor.trim)
+                self.pw  = await procs.launch(async_playwright().start())
+                t0 = time.perf_counter()
+                self.ctx = await procs.launch(self.pw.chromium.launch_persistent_context(
+                    str(self.dir), channel="msedge", headless=False,
+                    args=self.janitor.launch_args()
+                ))
+                await asyncio.to_thread(self.janitor.launched, time.perf_counter() - t0)
+                await asyncio.sleep(1)
+            dbg(f"{self.dir.name} context attached;", await self.browser.memory_line())
+
+    async def save_state(self):
+        if self.shared and self.ctx:
+            await self.ctx.storage_state(path=str(self._state_file))
+
+    async def close(self):
+        if not self.ctx:
+            return
+        try:
+            await self.save_state()
+            for page in list(self.blockers):
+                await self._close_page(page)
+            await self.ctx.close()
+            if self.pw:
+                await self.pw.stop()
+        finally:
+            self.ctx = self.pw = self.page = None
+            self._warm.clear()
 
     # ——— BACK IN StreamManager ———
-    async def mute_page(self):
-        """Mute all audio/video on the current page."""
-        if self.page:
-            await self.page.evaluate(
-                "() => { document.querySelectorAll('audio, video, iframe').forEach(el=>el.muted = true); }"
-            )
+    @staticmethod
+    async def _set_muted(page, muted):
+        # players often live in an iframe; a child frame that's gone or
+        # navigating away is skipped, only the main frame's failure counts
+        js = ("(m) => { window.__ssMuted = m; "
+              "document.querySelectorAll('audio, video').forEach(el => el.muted = m); }")
+        await page.main_frame.evaluate(js, muted)
+        await asyncio.gather(*(f.evaluate(js, muted) for f in page.frames
+                               if f is not page.main_frame),
+                             return_exceptions=True)
+
+    async def mute_page(self, page=None):
+        """Mute all audio/video on the current (or given) page, in every frame."""
+        if page is None:
+            self.muted = True
+        page = page or self.page
+        if page:
+            await self._set_muted(page, True)
             dbg(f"Muted {self.dir.name} page")
 
-    async def unmute_page(self):
-        """Unmute all audio/video on the current page."""
-        if self.page:
-            await self.page.evaluate(
-                "() => { document.querySelectorAll('audio, video, iframe').forEach(el=>el.muted = false); }"
-            )
+    async def unmute_page(self, page=None):
+        """Unmute all audio/video on the current (or given) page, in every frame."""
+        if page is None:
+            self.muted = False
+        page = page or self.page
+        if page:
+            await self._set_muted(page, False)
             dbg(f"Unmuted {self.dir.name} page")
-    async def open(self, url):
+
+    async def open(self, url, game_id=None, muted=False):
+        """Show url on the current page; muted keeps it silent throughout."""
+        if game_id is not None:
+            self._game_ids[url] = game_id
+        # the switch wins over background warming and memory renewal
+        if self._warm_task:
+            self._warm_task.cancel()
+        if self._renewing:
+            self._renewing.cancel()
+        async with self._open_lock:
+            await self._open(url, muted)
+
+    def schedule_warm(self, urls, game_ids=None):
+        """(Re)start background warming for urls; call on the loop thread.
+
+        game_ids maps urls to their games, so warming can follow their recipes.
+        """
+        self._game_ids.update(game_ids or {})
+        if self._warm_task:
+            self._warm_task.cancel()
+        self._warm_task = asyncio.ensure_future(self.warm(urls))
+        self._warm_task.add_done_callback(self._warm_done)
+
+    def _warm_done(self, task):
+        if not task.cancelled() and task.exception():
+            dbg(f"{self.dir.name} warm failed:", task.exception())
+
+    async def _open(self, url, muted=False):
+        await self.start()
+        old, prev_url = self.page, self.url
+        warm = self._warm.pop(url, None)
+        if warm is not None and warm.is_closed():
+            warm = None
+        if warm is None and old:
+            await self._close_page(old)
+            old = None
+        if warm is None:
+            with tracer.span("page.new"):
+                self.page = await self._new_page()
+        else:
+            self.page = warm
+        self.url  = url
+        self.muted = muted
+        if warm:
+            # already navigated, signed in and started — just make it audible
+            dbg(f"Promoting warm {self.dir.name} page:", url)
+            if not muted:
+                with tracer.span("page.promote"):
+                    await self.unmute_page()
+        else:
+            with tracer.span("page.goto"):
+                await self.page.goto(url)
+            dbg("Opened", url)
+            if not muted:
+                await self.unmute_page()
+            with tracer.span("page.prepare"):
+                await self._prepare(self.page, url)
+        if self.page in self.blockers:
+            self.blockers[self.page].report()
+        if old is not None:
+            await self._recycle(old, prev_url)
+
+    async def warm(self, urls):
+        """Keep muted, pre-navigated pages for the first pool_size of urls."""
+        if self.pool_size <= 0:
+            return
+        await self.start()
+        wanted = [u for u in urls if u != self.url][:self.pool_size]
+        for u in list(self._warm):
+            if u not in wanted:
+                await self._close_page(self._warm.pop(u))
+        for u in wanted:
+            if u in self._warm:
+                continue
+            page = await self._new_page()
+            try:
+                with tracer.attrs(warm=True, league=self.dir.name.upper()):
+                    with tracer.span("page.goto"):
+                        await page.goto(u)
+                    with tracer.span("page.prepare"):
+                        await self._prepare(page, u)
+                await self.mute_page(page)
+            except BaseException:
+                await self._close_page(page)
+                raise
+            self._warm[u] = page
+            dbg(f"Warmed {self.dir.name} page:", u)
+
+    async def renew(self, fresh_context=False):
+        """Reopen the current game in a new page and hand audio over to it.
+
+        The new page loads muted; once it is playing it is unmuted (unless
+        the stream is muted) and the old one closed, so the gap is a short
+        handoff. Warm pages are dropped first. fresh_context (shared mode) also moves to a new context, which
+        sheds its caches and service workers. Returns False with nothing open.
+        """
+        if self._warm_task:
+            self._warm_task.cancel()
+            await asyncio.wait([self._warm_task])
+        async with self._open_lock:
+            if not self.page or not self.url:
+                return False
+            self._renewing = asyncio.current_task()
+            old_page, old_ctx, url = self.page, None, self.url
+            try:
+                for u in list(self._warm):
+                    await self._close_page(self._warm.pop(u))
+                if fresh_context and self.shared:
+                    await self.save_state()
+                    old_ctx  = self.ctx
+                    self.ctx = await self.browser.new_context(storage_state=str(self._state_file))
+                page = await self._new_page()
+                try:
+                    with tracer.attrs(warm=True, league=self.dir.name.upper()):
+                        with tracer.span("page.goto"):
+                            await page.goto(url)
+                        with tracer.span("page.prepare"):
+                            await self._prepare(page, url)
+                except BaseException:
+                    await self._close_page(page)
+                    if old_ctx is not None:
+                        await self.ctx.close()
+                        self.ctx = old_ctx
+                    raise
+                # a switch arriving now must not strand the old page or context
+                await asyncio.shield(self._handoff(page, old_page, old_ctx))
+                dbg(f"Renewed {self.dir.name} {'context' if old_ctx else 'page'}:", url)
+                return True
+            finally:
+                self._renewing = None
+
+    async def _handoff(self, page, old_page, old_ctx):
+        # the new stream is audible before the old one goes
+        self.page = page
+        if not self.muted:
+            await self.unmute_page(page)
+        await self._close_page(old_page)
+        if old_ctx is not None:
+            await old_ctx.close()
+
+    async def js_heap(self):
+        """Bytes of JS heap in use on the current page (0 if unknown)."""
+        if not self.page:
+            return 0
+        try:
+            return await self.page.evaluate(
+                "() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except Exception:
+            return 0
+
+    async def _recycle(self, page, url):
+        # the game we just left is a likely "previous" target; keep it if there's room
+        if url and len(self._warm) < self.pool_size:
+            await self.mute_page(page)
+            self._warm[url] = page
+        else:
+            await self._close_page(page)
+
+    async def _new_page(self):
+        page = await self.ctx.new_page()
+        # everything the page plays starts muted until it's unmuted on purpose
+        await page.add_init_script(WARM_MUTE_JS)
+        if self.audio_only:
+            blocker = PageBlocker(self.dir.name.lower())
+            await blocker.attach(page)
+            self.blockers[page] = blocker
+        return page
+
+    async def _close_page(self, page):
+        blocker = self.blockers.pop(page, None)
+        if blocker:
+            blocker.report()
+        await page.close()
+
+    async def is_authenticated(self):
+        """Cheap signed-in check: are the cookies we had after the last confirmed
+        sign-in still present and unexpired? No page probing involved."""
+        if self._auth is None:
+            try:
+                self._auth = json.loads(await asyncio.to_thread(self._auth_file.read_text))
+            except Exception:
+                self._auth = []
+        if not self._auth:
+            return False
+        now  = time.time()
+        live = {(c["name"], c["domain"]) for c in await self.ctx.cookies()
+                if c.get("expires", -1) > now}
+        return all((c["name"], c["domain"]) in live for c in self._auth)
+
+    async def remember_auth(self):
+        """Record this league's persistent cookies as the signed-in fingerprint."""
+        # the league's site host, minus "www." (nba.com, or a replay server)
+        sites = [urlsplit(a.site).hostname for a in LEAGUES.values() if a.profile == self.dir.name]
+        site  = sites[0].removeprefix("www.") if sites else f"{self.dir.name.lower()}.com"
+        now  = time.time()
+        self._auth = [
+            {"name": c["name"], "domain": c["domain"]}
+            for c in await self.ctx.cookies()
+            if site in c["domain"] and c.get("expires", -1) > now + 60
+        ]
+        await asyncio.to_thread(self._auth_file.write_text, json.dumps(self._auth))
+        await self.save_state()
+        dbg(f"Cached {self.dir.name} auth state ({len(self._auth)} cookies)")
+
+    def forget_auth(self):
+        self._auth = []
+        self._auth_file.unlink(missing_ok=True)
+
+    async def _prepare(self, page, url):
+        """Consent, sign-in and start-audio steps for a page already at url."""
 
         async def wait_for_network_idle_with_timeout(page, timeout):
             try:
@@ -137,265 +494,643 @@ class StreamManager:
             except asyncio.TimeoutError:
                 print(f"Operation timed out after {timeout} seconds.")
 
-        # Example usage with a 10-second timeout
+        game_id = self._game_ids.get(url)
 
-        await self.ready.wait()
-        if self.page:
-            await self.page.close()
-        self.page = await self.ctx.new_page()
-        await self.page.goto(url)
-        dbg("Opened", url)
-        await self.unmute_page()
         # — NBA auto‑login & click “Listen”/“Watch Live” —
         if self.dir.name.lower() == "nba":
-            try:
-                await self.page.wait_for_selector('#onetrust-accept-btn-handler', timeout=3000)
-                await self.page.click('#onetrust-accept-btn-handler')
-                dbg("Clicked cookie‑consent accept")
-            except Exception:
-                pass
-
-            # If signed‑out link present, go log in
-            if await self.page.query_selector('a[href="/account/sign-in"]'):
-                dbg("NBA signed‑out → signing in…")
-                await self.page.goto("https://www.nba.com/account/sign-in")
-                await self.page.wait_for_selector("#email")
-                creds = (BASE_DIR/"credentials-nba.txt").read_text().splitlines()
-                user, pwd = creds[0], creds[1]
-                await self.page.fill("#email", user)
-                await self.page.fill("#password", pwd)
-                await self.page.click("#submit")
-                await self.page.wait_for_load_state("networkidle")
-                await self.page.goto(url)
-
-            # then kick off the audio
-            try:
-                await self.page.wait_for_selector('button:text("Watch Live")', timeout=5000)
-                await self.page.click('button:text("Watch Live")')
-                dbg("Clicked NBA “Watch Live”")
-            except:
-                try:
-                    await self.page.wait_for_selector('button:text("Listen")', timeout=5000)
-                    await self.page.click('button:text("Listen")')
-                    dbg("Clicked NBA “Listen”")
-                except:
+            authed = await self.is_authenticated()
+            cands  = {
+                "consent": '#onetrust-accept-btn-handler',
+                "watch":   'button:text("Watch Live")',
+                "listen":  'button:text("Listen")',
+            }
+            # the button that worked for this game last time is the only one raced
+            known  = (await self.recipes.get(game_id)).get("button")
+            other  = {"watch": "listen", "listen": "watch"}.get(known)
+            parked = {other: cands.pop(other)} if other else {}
+            signin = 'a[href="/account/sign-in"]'
+            logged = False   # one sign-in attempt per open
+            if not authed:
+                cands["signin"] = signin
+            else:
+                dbg("NBA profile already signed in; not waiting on the sign-in link")
+
+            # whichever prompt shows up first decides the next step
+            while True:
+                with tracer.span("probe"):
+                    name, el = await race_selectors(page, cands, timeout=5000)
+                if name == "consent":
+                    await el.click()
+                    dbg("Clicked cookie‑consent accept")
+                    del cands["consent"]
+                    continue
+
+                # the button can render before the header's sign-in link does;
+                # with cookies that look signed in, the link means the session
+                # expired server-side
+                if name in ("watch", "listen") and not logged \
+                        and await page.query_selector(signin):
+                    if authed:
+                        dbg("NBA sign-in cookies present but the session is gone")
+                        self.forget_auth()
+                        authed = False
+                    name = "signin"
+
+                if name == "signin":
+                    dbg("NBA signed‑out → signing in…")
+                    with tracer.span("login"):
+                        await page.goto(f"{LEAGUES['NBA'].site}/account/sign-in")
+                        await page.wait_for_selector("#email")
+                        user, pwd = await read_credentials("nba")
+                        await page.fill("#email", user)
+                        await page.fill("#password", pwd)
+                        await page.click("#submit")
+                        await page.wait_for_load_state("networkidle")
+                        await page.goto(url)
+                    logged = True
+                    cands.pop("signin", None)
+                    cands.pop("consent", None)
+                    continue
+
+                if name in ("watch", "listen"):
+                    with tracer.span("watch_click"):
+                        await el.click()
+                    dbg(f"Clicked NBA “{'Watch Live' if name == 'watch' else 'Listen'}”"
+                        + (" (recipe)" if name == known else ""))
+                    await self.recipes.update(game_id, button=name)
+                    if not authed:
+                        await self.remember_auth()
+                elif parked:
+                    dbg(f"NBA recipe button “{known}” missing; trying both")
+                    cands.update(parked)
+                    parked = {}
+                    continue
+                else:
                     dbg("NBA watch button not found.")
+                break
 
         # … inside your auto‑login routine, after you do page.goto(url) …
 # … inside your auto‑login routine, after you do page.goto(url) …
         elif self.dir.name.lower() == "mlb":
             # give the page a moment to settle
-            await wait_for_network_idle_with_timeout(self.page, timeout=10)
+            with tracer.span("network_idle"):
+                await wait_for_network_idle_with_timeout(page, timeout=10)
 
             # 1) dismiss OneTrust banner (main frame or any frame)
-            btn = await self.page.query_selector('#onetrust-accept-btn-handler')
-            if btn:
-                await btn.click()
-                dbg("Clicked OneTrust accept in main frame")
-            else:
-                for frame in self.page.frames:
-                    btn = await frame.query_selector('#onetrust-accept-btn-handler')
-                    if btn:
-                        await btn.click()
-                        dbg(f"Clicked OneTrust accept in frame {frame.name or frame.url}")
-                        break
-
-            # 2) detect & fill username if we’re on the login page
-            try:
-                identifier = await self.page.wait_for_selector(
-                    'input[name="identifier"], input[autocomplete="username"]',
-                    timeout=5000
-                )
-                dbg("MLB login prompt detected – filling username/password")
-
-                # read credentials
-                username, password = (BASE_DIR / "credentials-mlb.txt")\
-                    .read_text().splitlines()[:2]
-
-                # fill username + continue
-                await identifier.fill(username)
-                await self.page.click(
-                    'input.button-primary[type="submit"], input[type="submit"][value="Continue"]'
-                )
-                dbg("Submitted MLB username")
-
-                # optional “Verify Account With Password”
-                try:
-                    verify = await self.page.wait_for_selector(
-                        'a.button.select-factor.link-button:has-text("Verify Account With Password")',
-                        timeout=2000
+            with tracer.span("consent"):
+                btn = await page.query_selector('#onetrust-accept-btn-handler')
+                if btn:
+                    await btn.click()
+                    dbg("Clicked OneTrust accept in main frame")
+                else:
+                    for frame in page.frames:
+                        btn = await frame.query_selector('#onetrust-accept-btn-handler')
+                        if btn:
+                            await btn.click()
+                            dbg(f"Clicked OneTrust accept in frame {frame.name or frame.url}")
+                            break
+
+            # 2) signed-in profiles skip the login probes entirely, unless the
+            #    login form is plainly on screen
+            login_sel = 'input[name="identifier"], input[autocomplete="username"]'
+            authed    = await self.is_authenticated()
+            if authed and await page.query_selector(login_sel):
+                dbg("MLB sign-in cookies present but the session is gone")
+                self.forget_auth()
+            elif authed:
+                dbg("MLB profile already signed in; skipping login probes")
+                # the recipe's feed if there is one, else the first, which starts the recipe
+                await self._select_mlb_feed(page, game_id)
+                return
+
+            # 3) race the login steps; handle whichever prompt is showing
+            cands = {
+                "username": login_sel,
+                "verify":   'a.button.select-factor.link-button:has-text("Verify Account With Password")',
+                "password": 'input[name="credentials.passcode"], #input62',
+            }
+            username = password = None
+            while True:
+                with tracer.span("probe"):
+                    name, el = await race_selectors(page, cands, timeout=5000)
+                if name and username is None:
+                    # read credentials
+                    username, password = await read_credentials("mlb")
+
+                if name == "username":
+                    dbg("MLB login prompt detected – filling username/password")
+                    await el.fill(username)
+                    await page.click(
+                        'input.button-primary[type="submit"], input[type="submit"][value="Continue"]'
                     )
-                    await verify.click()
+                    dbg("Submitted MLB username")
+                    del cands["username"]
+
+                elif name == "verify":
+                    await el.click()
                     dbg("Clicked ‘Verify Account With Password’")
-                except PlaywrightTimeoutError:
-                    dbg("No ‘Verify Account With Password’ link")
+                    del cands["verify"]
 
-            except PlaywrightTimeoutError:
-                dbg("No MLB username prompt (already signed in?)")
+                elif name == "password":
+                    await el.fill(password)
+                    dbg("Filled MLB password")
 
-            # 3) detect & fill password if prompted
-            try:
-                pwd_field = await self.page.wait_for_selector(
-                    'input[name="credentials.passcode"], #input62',
-                    timeout=2000
-                )
-                await pwd_field.fill(password)
-                dbg("Filled MLB password")
+                    await page.wait_for_selector(
+                        'input.button.button-primary[type="submit"][value="Log in"][data-type="save"]')
+                    with tracer.span("login"):
+                        await page.click('input.button.button-primary[type="submit"][value="Log in"][data-type="save"]')
 
-                await self.page.wait_for_selector(
-                    'input.button.button-primary[type="submit"][value="Log in"][data-type="save"]')
-                await self.page.click('input.button.button-primary[type="submit"][value="Log in"][data-type="save"]')
+                        await page.wait_for_url("**/tv/**", timeout=5000)
 
-                await self.page.wait_for_url("**/tv/**", timeout=5000)
+                        # now we’re on the protected MLB TV page
+                        await page.wait_for_load_state("networkidle")
+                    await self.remember_auth()
+                    await self._select_mlb_feed(page, game_id)
+                    return
 
-                # now we’re on the protected MLB TV page
-                await self.page.wait_for_load_state("networkidle")
+                else:
+                    dbg("No MLB login prompt (already signed in?)")
+                    if "/tv/" in page.url:
+                        await self.remember_auth()
+                        await self._select_mlb_feed(page, game_id)
+                    return
+
+    async def cycle_feed(self, game_id):
+        """Move the game on screen to its next audio feed; returns the feed's label."""
+        if self.dir.name.lower() != "mlb":
+            return None   # NBA pages have a single broadcast
+        async with self._open_lock:
+            if not self.page or self._game_ids.get(self.url) != game_id:
+                return None
+            return await self._select_mlb_feed(self.page, game_id, step=1)
+
+    async def _select_mlb_feed(self, page, game_id=None, step=0):
+        with tracer.span("feed_select"):
+            return await self._click_mlb_feed(page, game_id, step)
+
+    async def _click_mlb_feed(self, page, game_id, step):
+        """Click the recipe's feed moved by step; the selector's buttons are only
+        enumerated when there is no recipe or its label is gone."""
+        recipe = await self.recipes.get(game_id)
+        feeds  = recipe.get("feeds") or []
+        idx    = recipe.get("feed", 0) + step
+        # === Try Audio Feed First ===
+        try:
+            # 1) open the broadcast selector
+            await page.get_by_role("button", name="Broadcast selector").click()
+            dbg("Clicked Broadcast selector")
 
-                # === Try Audio Feed First ===
+            # 2) the known label, straight from the recipe
+            if feeds:
+                label = feeds[idx % len(feeds)]
                 try:
-                    # 1) open the broadcast selector
-                    await self.page.get_by_role("button", name="Broadcast selector").click()
-                    dbg("Clicked Broadcast selector")
-
-                    # 2) grab *all* audio‐feed buttons by their accessible name
-                    feeds = self.page.get_by_role("button").filter(
-                        has=self.page.get_by_label("AUDIO -")
-                    )
-                    count = await feeds.count()
-                    if count > 0:
-                        # pick the one at our current index
-                        idx = self._mlb_feed_index % count
-                        feed_btn = feeds.nth(idx)
-                        label = await feed_btn.get_attribute("aria-label")
-                        await feed_btn.click()
-                        dbg(f"Clicked MLB audio feed: {label}")
-                        self._mlb_feed_index += 1
-                        return  # done—audio is playing
-                    else:
-                        dbg("No enabled audio feeds found, falling back to TV")
+                    await page.get_by_role("button", name=label, exact=True).click(timeout=3000)
+                    dbg(f"Clicked MLB audio feed: {label} (recipe)")
+                    await self.recipes.update(game_id, feed=idx % len(feeds))
+                    return label
                 except Exception as e:
-                    dbg("Audio‐feed attempt failed:", e)
+                    dbg(f"Recipe feed {label!r} not clickable, re-reading feeds:", e)
 
-                # === Fallback to TV (do nothing since the video is already loaded) ===
-                dbg("Falling back to TV stream")
-            except PlaywrightTimeoutError:
-                dbg("No MLB password prompt (already signed in?)")
+            # 3) otherwise grab *all* audio‐feed buttons by their accessible name
+            buttons = page.get_by_role("button").filter(
+                has=page.get_by_label("AUDIO -")
+            )
+            labels = await buttons.evaluate_all("els => els.map(e => e.getAttribute('aria-label'))")
+            if labels:
+                idx %= len(labels)
+                await buttons.nth(idx).click()
+                dbg(f"Clicked MLB audio feed: {labels[idx]}")
+                await self.recipes.update(game_id, feeds=labels, feed=idx)
+                return labels[idx]  # done—audio is playing
+            else:
+                dbg("No enabled audio feeds found, falling back to TV")
+        except Exception as e:
+            dbg("Audio‐feed attempt failed:", e)
+
+        # === Fallback to TV (do nothing since the video is already loaded) ===
+        dbg("Falling back to TV stream")
+        return None
+
+
+class NavigationSupervisor:
+    """Latest-wins bookkeeping for game switches.
+
+    Every switch gets a generation id from begin(); tasks submitted under it
+    are cancelled as soon as a newer switch begins, and is_current() lets
+    callbacks drop results that arrive late.
+    """
+
+    def __init__(self, loop):
+        self.loop       = loop
+        self.generation = 0
+        self._tasks     = {}   # task -> generation
+
+    def begin(self):
+        self.generation += 1
+        gen = self.generation
+        self.loop.call_soon_threadsafe(self._cancel_older_than, gen)
+        return gen
+
+    def is_current(self, gen):
+        return gen == self.generation
+
+    def submit(self, gen, coro):
+        """Schedule coro on the loop under gen (thread-safe); skipped if already stale."""
+        def start():
+            if not self.is_current(gen):
+                coro.close()
+                return
+            task = self.loop.create_task(coro)
+            self._tasks[task] = gen
+            task.add_done_callback(self._done)
+        self.loop.call_soon_threadsafe(start)
+
+    def _done(self, task):
+        self._tasks.pop(task, None)
+        if not task.cancelled() and task.exception():
+            dbg("switch task failed:", task.exception())
+
+    def _cancel_older_than(self, gen):
+        for task, g in list(self._tasks.items()):
+            if g < gen:
+                dbg(f"Cancelling stale switch #{g} task")
+                task.cancel()
 
-class GameCycler:
-    def __init__(self, root):
-        self.root       = root
-        root.title("NBA + MLB Cycler")
-        self.lbl1       = tk.Label(root, text="Loading games…", font=("Arial",16))
-        self.lbl1.pack(pady=8)
-        self.lbl2       = tk.Label(root, text="",             font=("Arial",14))
-        self.lbl2.pack(pady=4)
-        tk.Button(root, text="Next Game", command=self.next_game).pack(pady=10)
 
-        self.nba_mgr    = StreamManager("nba")
-        self.mlb_mgr    = StreamManager("mlb")
-        self.game_list  = []   # list of (league, meta_dict)
+class GameCycler:
+    """The fetch/stream/announce engine, with no UI of its own.
+
+    All of its state lives on the loop thread. Commands arrive through
+    command() (the control API, the controller); what changes goes out as
+    events to every subscribe() queue. CyclerWindow is one such client.
+    """
+
+    COMMANDS = {
+        "next":        "next_game",
+        "previous":    "previous_game",
+        "next_league": "next_league",
+        "replay":      "replay_announcement",
+        "next_feed":   "next_feed",
+        "rundown":     "rundown",
+        "select":      "select",
+        "mute":        "set_muted",
+    }
+    SUBSCRIBER_QUEUE = 256   # events buffered per subscriber before the oldest are dropped
+
+    def __init__(self, loop, bridge, timer=None):
+        self.timer      = timer or StageTimer()
+        self.loop       = loop
+        self.bridge     = bridge   # blocking I/O pool and loop-lag watchdog
+        self.nav        = NavigationSupervisor(loop)
+        self.browser    = SharedBrowser()
+        self.managers   = {name: StreamManager(a.profile, self.browser)
+                           for name, a in LEAGUES.items()}
+        self._league_rank = {name: i for i, name in enumerate(LEAGUES)}
+        self.memwatch   = MemoryWatchdog(self.browser, list(self.managers.values()),
+                                         RSS_BUDGET_MB)
+        self.http       = HttpClient()
+        # a replayed slate never lands in the real schedule cache
+        self.store      = ScheduleStore(SCHEDULE_DB.with_name("schedule-replay.sqlite3")
+                                        if REPLAY_URL else SCHEDULE_DB)
+        self.scoreboards = ScoreboardCache(self.http, store=self.store)
+        self.poller     = ScoreboardPoller(self.scoreboards, self._on_scores_changed)
+        self.live       = LiveTracker(self.http, self._on_live_update)   # the on-screen game's own feed
+        self.control    = None
+        self.game_list  = []   # Game records, league blocks sorted by status
         self.idx        = 0
         self.current    = None
-
-
-        # before starting asyncio:
+        self.last_mgr   = None
+        self.muted      = False
+        self.loading    = False
+        self.prefetch_ahead = 3   # games ahead of idx whose announcements are pre-rendered
+        self._cached_age = {}     # league -> age (s) of the cached slate shown at startup
+        self._withheld   = None   # key of the game shown from cache without its score
+        self._subscribers = set()
+
+        # audio comes up off the loop; prompts queue until it's running
+        self.audio      = AudioScheduler(speech_cache)
         self.first_load = True
-        threading.Thread(target=self._startup_sound_loop, daemon=True).start()
-
-        pygame.mixer.init()
-        self.loop       = asyncio.new_event_loop()
-        threading.Thread(target=self._run_loop, daemon=True).start()
-        asyncio.run_coroutine_threadsafe(self._startup(), self.loop)
-
-    def _startup_sound_loop(self):
-        # runs until first_load is set False
-        while self.first_load:
-            # update on‑screen prompt
-            self.root.after(0, lambda: self.lbl1.config(text="Opening, please wait…"))
-            playSound("Opening, please wait")
-            time.sleep(4)
-    def _status_key(self, entry):
-        league, meta = entry
-        if league == "NBA":
-            code = meta.get("gameStatus", 1)
-            # Live→0, Final→1, Scheduled→2
-            return 0 if code == 2 else 1 if code == 3 else 2
-        else:
-            state = meta.get("state", "Preview")
-            return 0 if state == "Live" else 1 if state == "Final" else 2
-
-    def _run_loop(self):
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
+        self._startup_pending = {"browser", "first game"}
+        self.audio.prompt("Opening, please wait", "startup", repeat=4)
+        tracer.on_switch(self._on_switch)
+
+    async def start(self, host=CONTROL_HOST, port=CONTROL_PORT, need_api=False):
+        """Bring up the control API, then everything else; on the loop.
+
+        need_api (the daemon, which nothing else can drive) makes a port that
+        can't be bound fatal instead of logged.
+        """
+        self.bridge.submit_io(self._init_audio)
+        self.control = ControlServer(self, host, port)
+        try:
+            await self.control.start()
+        except OSError as e:
+            if need_api:
+                raise
+            dbg("Control API unavailable:", e)
+        await self._startup()
+
+    def _init_audio(self):
+        import pygame
+        with self.timer.span("audio init"):
+            with SDL_INIT_LOCK:
+                pygame.mixer.init()
+            self.audio.start()
+        speech_cache.purge_legacy()
+        speech_cache.prewarm(FIXED_PROMPTS)
+
+    # — control API —
+
+    def command(self, name, **args):
+        """Run a named command on the loop thread; KeyError if there's no such command."""
+        return getattr(self, self.COMMANDS[name])(**args)
+
+    def status(self):
+        state = "loading" if self.loading else "ready" if self.current else "starting"
+        return {
+            "state":   state,
+            "current": self.current.as_dict() if self.current else None,
+            "index":   self.idx,
+            "games":   [g.as_dict() for g in self.game_list],
+            "muted":   self.muted,
+        }
+
+    def subscribe(self):
+        q = asyncio.Queue(self.SUBSCRIBER_QUEUE)
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        self._subscribers.discard(q)
+
+    def _publish(self, event):
+        for q in self._subscribers:
+            if q.full():
+                q.get_nowait()   # a stalled client loses the oldest, not the loop
+            q.put_nowait(event)
+
+    def _publish_current(self):
+        self._publish({"type": "current", "game": self.current.as_dict()})
+
+    def _on_switch(self, switch):
+        # only the switch that actually landed; superseded ones are noise
+        if self.nav.is_current(switch):
+            self._publish({"type": "phases", "switch": switch, "phases": tracer.phases(switch)})
+
+    def _startup_done(self, stage):
+        # one report, once both the browser and the first game have landed
+        self._startup_pending.discard(stage)
+        if not self._startup_pending:
+            self.timer.report()
+
+    def _status_key(self, game):
+        # Live→0, Final→1, Scheduled→2
+        return game.status
+
+    def _entry_key(self, game):
+        # game_list order: league blocks in registration order, each by _status_key
+        return (self._league_rank[game.league], self._status_key(game))
+
+    def _insert_sorted(self, game):
+        """Insert after every entry with an equal or smaller key; no full re-sort."""
+        key, lo, hi = self._entry_key(game), 0, len(self.game_list)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < self._entry_key(self.game_list[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        self.game_list.insert(lo, game)
+
+    async def shutdown(self):
+        """Save sign-ins, close contexts and stop only the processes we launched."""
+        self.poller.stop()
+        self.live.stop()
+        self.memwatch.stop()
+        if self.control:
+            await self.control.close()
+        for mgr in self.managers.values():
+            try:
+                await mgr.close()
+            except Exception as e:
+                dbg(f"{mgr.dir.name} close error:", e)
+        await self.browser.close()
+        await self.http.close()
+        await tracer.close()
+        self.store.close()
+        dbg("Loop bridge:", self.bridge.stats)
+        self.bridge.close()
 
     async def _startup(self):
-        dbg("Starting browsers…")
-        await asyncio.gather(self.nba_mgr.start(), self.mlb_mgr.start())
-
-        # fetch only *meta* for today's NBA + MLB
-        await self._fetch_nba_meta()
-        await self._fetch_mlb_meta()
-
-        # split into separate NBA/MLB lists
-        nba_list = [e for e in self.game_list if e[0] == "NBA"]
-        mlb_list = [e for e in self.game_list if e[0] == "MLB"]
-
-        # sort by in‑progress / final / scheduled
-        nba_list.sort(key=self._status_key)
-        mlb_list.sort(key=self._status_key)
-
-        # recombine
-        self.game_list = nba_list + mlb_list
-        dbg("Sorted NBA then MLB:", [
-            (l, m.get("gameStatus") or m.get("state")) for l,m in self.game_list
-        ])
+        # the browser launches alongside the schedule fetches; the first game is
+        # shown as soon as metadata lands, and its stream open waits on the browser
+        browser_task = asyncio.ensure_future(self._launch_browser())
+
+        # stale-while-revalidate: the slate saved by the last run goes up at once,
+        # then gets swapped for the fresh one when the fetches land
+        with self.timer.span("cached slate"):
+            cached = await self.bridge.io(self._cached_slate)
+        if cached:
+            self.game_list = cached
+            self.timer.mark("game list ready (cached)")
+            self._publish_slate()
+            self._load_and_show(self.idx)
+
+        async def timed(name, coro):
+            with self.timer.span(name):
+                return await coro
+
+        # fetch only *meta* for every league, all at once
+        fresh = await asyncio.gather(*(timed(f"{league} meta", self._fetch_meta(league))
+                                       for league in LEAGUES))
+
+        # a league whose fetch failed keeps its cached games
+        games = []
+        for league, got in zip(LEAGUES, fresh):
+            games.extend(got if got is not None else (g for g in cached if g.league == league))
+        # league blocks, each sorted by in‑progress / final / scheduled
+        games.sort(key=self._entry_key)
+        dbg("Sorted by league then status:", games)
+
+        if cached:
+            self._replace_slate(games)
+        else:
+            # load first
+            self.game_list = games
+            self.timer.mark("game list ready")
+            self._publish_slate()
+            self._load_and_show(self.idx)
+
+        # keep the list current from here on; seed with what we just fetched
+        for league, got in zip(LEAGUES, fresh):
+            if got is not None:
+                self.poller.seed(league, got)
+        self.poller.start()
+
+        # every matchup line on today's slate, so switching never waits on gTTS for it
+        speech_cache.prewarm([g.match for g in games])
+        self._prefetch_upcoming()
 
-        # load first
-        self.root.after(0, self._load_and_show, self.idx)
+        try:
+            await tracer.serve()
+        except OSError as e:
+            dbg("Metrics endpoint unavailable:", e)
 
-    async def _fetch_nba_meta(self):
-        url = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
-        dbg("🔍 _fetch_nba_meta starting:", url)
         try:
-            async with aiohttp.ClientSession() as s:
-                async with s.get(url) as r:
-                    dbg("NBA response status:", r.status)
-                    text = await r.text()
-                    data = json.loads(text)
-            games = data.get('scoreboard', {}).get('games', [])
-            dbg(f"Found {len(games)} NBA games")
-            for g in games:
-                self.game_list.append(("NBA", {
-                    "gameId":         g["gameId"],
-                    "awayTeam":       g["awayTeam"],
-                    "homeTeam":       g["homeTeam"],
-                    "gameStatus":     g["gameStatus"],
-                    "gameStatusText": g.get("gameStatusText",""),
-                    "gameDate":       g.get("gameDate")    # include for start‑time logic
-                }))
+            await browser_task
         except Exception as e:
-            dbg("NBA meta fetch error:", e)
-
-    async def _fetch_mlb_meta(self):
-        dbg("🔍 _fetch_mlb_meta starting")
+            dbg("Browser launch failed:", e)
+        self.memwatch.start()
+        self._startup_done("browser")
+
+    async def _launch_browser(self):
+        with self.timer.span("reap old browsers"):
+            await self.bridge.io(LaunchedProcesses.reap_orphans)
+        with self.timer.span("browser launch"):
+            if SHARED_BROWSER:
+                # league contexts attach lazily, on their first open
+                await self.browser.get()
+            else:
+                await asyncio.gather(*(m.start() for m in self.managers.values()))
+
+    def _cached_slate(self):
+        """Today's slate from the schedule store, sorted; blocks on disk."""
+        today, now = self.scoreboards.today(), datetime.now().astimezone()
+        games = []
+        for league in LEAGUES:
+            dates = self.scoreboards.window(league, today)
+            try:
+                rows = self.store.games(league, dates[0], dates[-1])
+            except Exception as e:
+                dbg(f"{league} schedule store read failed:", e)
+                continue
+            # later dates win for a game filed twice, as in ScoreboardCache.slate
+            slate = {g.id: g for g in rows if g.in_slate(today, now)}
+            games.extend(slate.values())
+            age = self.store.age(league, today)
+            self._cached_age[league] = age
+            if slate and age is not None:
+                dbg(f"{len(slate)} cached {league} games, {age / 60:.0f} min old")
+        return sorted(games, key=self._entry_key)
+
+    async def _fetch_meta(self, league):
+        dbg(f"🔍 {league} meta fetch starting")
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
-            url   = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&date={today}"
-            async with aiohttp.ClientSession() as s:
-                async with s.get(url) as r:
-                    dbg("MLB response status:", r.status)
-                    data = await r.json()
-            for date in data.get("dates",[]):
-                for g in date.get("games",[]):
-                    self.game_list.append(("MLB", {
-                        "gamePk":   g["gamePk"],
-                        "away":     g["teams"]["away"],
-                        "home":     g["teams"]["home"],
-                        "gameDate": g["gameDate"],
-                        "state":    g["status"]["abstractGameState"]
-                    }))
+            games = await self.scoreboards.slate(league)
+            dbg(f"Found {len(games)} {league} games")
+            return games
         except Exception as e:
-            dbg("MLB meta fetch error:", e)
+            dbg(f"{league} meta fetch error:", e)
+            return None
+
+    def _publish_slate(self):
+        self._publish({"type": "slate", "games": [g.as_dict() for g in self.game_list]})
+
+    def _replace_slate(self, games):
+        """Swap the cached slate for the revalidated one, staying on the same game."""
+        shown = self.game_list[self.idx].key if self.game_list else None
+        self.game_list = games
+        self.idx = next((i for i, g in enumerate(games) if g.key == shown), 0)
+        self._publish_slate()
+        fresh = {g.key: g for g in games}
+        if self.current and self.current.key in fresh:
+            old, g = self.current, fresh[self.current.key]
+            if g.fingerprint() != old.fingerprint() or self._withheld == g.key:
+                self._refresh_current(old, g)
+            else:
+                self.current = g
+                self._publish_current()
+        self._withheld = None
+        self.timer.mark("game list revalidated")
+        self._prefetch_upcoming()
+
+    def _refresh_current(self, old, g):
+        """The shown game turned out different from its cached entry: speak its
+        real status and score, and redo the live-feed and stream decisions."""
+        dbg(f"{g} changed on revalidation: {old.status_line!r} → {g.status_line!r}")
+        self.current = g
+        self.live.follow(g)
+        self._publish_current()
+        self.audio.queue((g.status_line, g.score_line), group=g.key)
+        if g.should_stream() and not old.should_stream():
+            mgr = self.last_mgr = self.managers[g.league]
+            self.nav.submit(self.nav.generation, self._open_and_warm(self.nav.generation, g, mgr))
+        elif old.should_stream() and not g.should_stream() and self.last_mgr:
+            self.bridge.to_loop(self.last_mgr.mute_page())
+
+    def _on_scores_changed(self, league, games, gone=()):
+        # poller callback, on the loop thread
+        self._apply_changes(league, games, gone=gone)
+        self._publish({"type": "scores", "league": league, "games": [g.as_dict() for g in games],
+                       "gone": [f"{league}:{gid}" for gid in gone]})
+
+    def _on_live_update(self, game, events):
+        # live tracker callback, on the loop thread
+        if not self.current or self.current.key != game.key:
+            return   # switched away while this was in flight
+        self._apply_changes(game.league, [game], live=True)
+        # behind anything already queued; a switch's announce() drops these
+        self.audio.queue(events, group=game.key)
+        self._publish({"type": "events", "game": game.as_dict()["key"], "lines": events})
+
+    def _apply_changes(self, league, games, live=False, gone=()):
+        """Fold changed games into game_list, repositioning only those that moved,
+        and drop league's games whose ids are in gone.
+
+        The on-screen game follows the live tracker while it has the game;
+        scoreboard updates for that game only update the list. If idx's game
+        is dropped, idx moves on to the game that followed it.
+        """
+        shown    = self.game_list[self.idx].key if self.game_list else None
+        upcoming = self._upcoming_keys()
+        order    = [e.key for e in self.game_list]   # cycling order before any change
+
+        if gone:
+            gone = {(league, gid) for gid in gone}
+            self.game_list = [e for e in self.game_list if e.key not in gone]
+
+        for g in games:
+            pos = next((i for i, e in enumerate(self.game_list) if e.key == g.key), None)
+            if pos is None:
+                self._insert_sorted(g)
+            elif self._entry_key(self.game_list[pos]) == self._entry_key(g):
+                self.game_list[pos] = g
+            else:
+                del self.game_list[pos]
+                self._insert_sorted(g)
+
+            # its status/score lines changed → render the new ones if it's coming up
+            if g.key in upcoming:
+                prefetcher.render((g.match, g.status_line, g.score_line))
+
+            # refresh the on-screen game in place
+            if self.current and self.current.key == g.key \
+                    and (live or not self.live.following(g.key)):
+                self.current = g
+                self._publish_current()
+
+        # keep idx on the same game even if entries shifted around it, or on
+        # the next surviving one if it was dropped
+        if shown:
+            pos   = {e.key: i for i, e in enumerate(self.game_list)}
+            start = order.index(shown)
+            after = (order[(start + k) % len(order)] for k in range(len(order)))
+            self.idx = next((pos[key] for key in after if key in pos), 0)
+
+    def _upcoming(self, count, start=1):
+        """The next count games after idx, in cycling order."""
+        n = len(self.game_list)
+        return [self.game_list[(self.idx + k) % n] for k in range(start, min(start + count, n))]
+
+    def _upcoming_keys(self):
+        return {g.key for g in self._upcoming(self.prefetch_ahead + 1, start=0)}
+
+    def _prefetch_upcoming(self):
+        """Pre-render match/status/score for the next few games in cycling order."""
+        for g in self._upcoming(self.prefetch_ahead):
+            prefetcher.render((g.match, g.status_line, g.score_line))
+
+    # — commands —
 
     def next_game(self):
         if not self.game_list:
@@ -403,203 +1138,352 @@ class GameCycler:
         self.idx = (self.idx + 1) % len(self.game_list)
         self._load_and_show(self.idx)
 
+    def previous_game(self):
+        if not self.game_list:
+            return
+        self.idx = (self.idx - 1) % len(self.game_list)
+        self._load_and_show(self.idx)
+
+    def next_league(self):
+        """Jump to the first game of the next league block in game_list."""
+        if not self.game_list:
+            return
+        n, league = len(self.game_list), self.game_list[self.idx].league
+        for k in range(1, n):
+            i = (self.idx + k) % n
+            if self.game_list[i].league != league:
+                self.idx = i
+                self._load_and_show(self.idx)
+                return
+
+    def select(self, key):
+        """Switch to the game with key "LEAGUE:id" (as in status())."""
+        for i, g in enumerate(self.game_list):
+            if f"{g.league}:{g.id}" == key:
+                self.idx = i
+                self._load_and_show(i)
+                return
+        raise ValueError(f"no game {key!r} on the slate")
+
+    def replay_announcement(self):
+        if not self.current:
+            return
+        g = self.current
+        self.audio.announce((g.match, g.status_line, g.score_line), group=g.key)
+
+    def rundown(self):
+        """Speak every live and recently final game, one clip per league.
+
+        Read from the scoreboard snapshots the poller keeps; nothing is
+        switched or opened.
+        """
+        self.bridge.to_loop(self._rundown())
+
+    async def _rundown(self):
+        with tracer.span("rundown"):
+            slates = await asyncio.gather(
+                *(self.scoreboards.slate(league, max_age=RUNDOWN_MAX_AGE) for league in LEAGUES),
+                return_exceptions=True)
+        now, texts = datetime.now().astimezone(), []
+        for league, games in zip(LEAGUES, slates):
+            if isinstance(games, Exception):
+                dbg(f"{league} rundown fetch failed, using the list we have:", games)
+                games = [g for g in self.game_list if g.league == league]
+            text = rundown(league, games, now)
+            if text:
+                texts.append(text)
+        texts = texts or ["No games in progress."]
+        self.audio.announce(texts, group="rundown")
+        self._publish({"type": "rundown", "lines": texts})
+
+    def next_feed(self):
+        """Switch the game on screen to its next audio feed, where the site has several."""
+        g = self.current
+        if not g or not g.should_stream():
+            return
+        self.bridge.to_loop(self._next_feed(g))
+
+    async def _next_feed(self, g):
+        label = await self.managers[g.league].cycle_feed(g.id)
+        if label:
+            label = label.removeprefix("AUDIO - ")
+            self.audio.queue([label], group=g.key)
+            self._publish({"type": "feed", "game": g.as_dict()["key"], "label": label})
+
+    def set_muted(self, muted=None):
+        """Mute or unmute the stream (toggle without an argument); announcements still play."""
+        self.muted = (not self.muted) if muted is None else bool(muted)
+        if self.last_mgr:
+            self.bridge.to_loop(self.last_mgr.mute_page() if self.muted
+                                else self.last_mgr.unmute_page())
+        self._publish({"type": "muted", "muted": self.muted})
+
+    # — switching —
+
     def _load_and_show(self, idx):
-        # announce loading
-        self.lbl1.config(text="Loading next game…")
-        self.lbl2.config(text="")
         self.loading = True
-        threading.Thread(target=self._loading_loop, daemon=True).start()
-        asyncio.run_coroutine_threadsafe(self._fetch_and_display(idx), self.loop)
-
-    def _loading_loop(self):
-        while getattr(self, "loading", False):
-            playSound("Loading next game")
-            time.sleep(4)
-
-    async def _fetch_and_display(self, idx):
-        league, meta = self.game_list[idx]
-        dbg(f"Fetching details for {league}", meta)
-        if league == "NBA":
-            g = await self._fetch_nba_detail(meta["gameId"])
-        else:
-            g = await self._fetch_mlb_detail(meta["gamePk"])
-        self.current = (league, g)
+        self._publish({"type": "loading"})
+        # the old game's lines are stale now; repeated presses keep a single
+        # "loading" prompt going
+        if self.current:
+            self.audio.cancel(self.current.key)
+        self.audio.prompt("Loading next game", "loading", repeat=4)
+        gen = self.nav.begin()
+        self._switch_t0 = time.perf_counter()
+        self.nav.submit(gen, self._fetch_and_display(idx, gen))
+
+    async def _fetch_and_display(self, idx, gen):
+        entry = self.game_list[idx]
+        dbg(f"Fetching details for {entry} (switch #{gen})")
+        cached = False
+        with tracer.attrs(switch=gen, league=entry.league, game=entry.id), \
+                tracer.span("scoreboard"):
+            if self.scoreboards.peek(entry.league, entry.date) is None:
+                # cached slate, network not back yet: show what we have, revalidation follows
+                g, cached = entry, True
+            else:
+                # served from the shared snapshot while fresh; dict lookup, no scan
+                g = await self.scoreboards.game(entry.league, entry.id, entry.date)
+        if g is None:
+            raise RuntimeError(f"{entry.league} game not found")
+        if not self.nav.is_current(gen):
+            return
+        self.current = g
         self.loading = False
-        self.root.after(0, self._render_current)
-
-    async def _fetch_nba_detail(self, gameId):
-        url = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
-        async with aiohttp.ClientSession() as s:
-            r    = await s.get(url)
-            data = await r.json(content_type=None)
-        for g in data['scoreboard']['games']:
-            if g["gameId"] == gameId:
-                return g
-        raise RuntimeError("NBA game not found")
-
-    async def _fetch_mlb_detail(self, gamePk):
-        today = datetime.now().strftime("%Y-%m-%d")
-        url   = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&date={today}"
-        async with aiohttp.ClientSession() as s:
-            r    = await s.get(url)
-            data = await r.json()
-        for date in data.get("dates", []):
-            for g in date.get("games", []):
-                if g["gamePk"] == gamePk:
-                    return g
-        raise RuntimeError("MLB game not found")
-
-    def _render_current(self):
-          # if we’re switching from a previous live stream, mute it
-
-        if hasattr(self, "last_mgr") and self.last_mgr:
-            asyncio.run_coroutine_threadsafe(self.last_mgr.mute_page(), self.loop)
-
-        # 1) Stop any “loading…” loop
+        self.live.follow(g)
+        age = self._cached_age.get(g.league)
+        self._render_current(gen, stale=cached and (age is None or age > CACHED_SCORE_AGE))
+
+    def _render_current(self, gen, stale=False):
+        # if we’re switching from a previous live stream, mute it
+        if self.last_mgr:
+            self.bridge.to_loop(self.last_mgr.mute_page())
+
+        # 1) Stop any “loading…” prompt
         self.loading = False
+        self.audio.cancel("loading")
 
         # 2) Only-once startup flag
-        if getattr(self, "first_load", True):
+        if self.first_load:
             self.first_load = False
+            self.audio.cancel("startup")
+            self.timer.mark("first game on screen")
+            self._startup_done("first game")
+
+        g     = self.current
+        trace = {"switch": gen, "league": g.league, "game": g.id}
+
+        with tracer.span("render", **trace):
+            # — Tell the clients —
+            self._publish_current()
+
+            # — Speak: preempts the previous game's announcement —
+            # (an old cached entry's score waits for revalidation)
+            lines = (g.match, g.status_line, g.score_line)
+            if stale:
+                lines, self._withheld = (g.match,), g.key
+            prefetcher.render(lines)
+            self.audio.announce(lines, group=g.key, trace=trace)
+
+        # — Open stream if flagged, then warm pages for what's next —
+        mgr = self.managers[g.league] if g.should_stream() else None
+        if mgr:
+            self.last_mgr = mgr
+        self.nav.submit(gen, self._open_and_warm(gen, g, mgr))
+
+        # — Get the next few games' clips ready —
+        self._prefetch_upcoming()
+
+    async def _open_and_warm(self, gen, game, mgr):
+        with tracer.attrs(switch=gen, league=game.league, game=game.id):
+            if mgr:
+                with tracer.span("open"):
+                    await mgr.open(game.stream_url, game.id, muted=self.muted)
+            # press → stream up (or, with nothing to stream, → announced)
+            tracer.record("switch", time.perf_counter() - self._switch_t0)
+        tracer.switch_done(gen)
+        # upcoming streamable games in cycling order, split per manager
+        now    = datetime.now().astimezone()
+        wanted = {m: [] for m in self.managers.values()}
+        ids    = {}
+        for g in self._upcoming(len(self.game_list)):
+            if g.should_stream(now):
+                wanted[self.managers[g.league]].append(g.stream_url)
+                ids[g.stream_url] = g.id
+        for m, urls in wanted.items():
+            m.schedule_warm(urls[:m.pool_size], ids)
+        if mgr:
+            dbg(await self.browser.memory_line())
+
+
+class CyclerWindow:
+    """The Tk window: a thin client of the cycler's commands and events.
+
+    Its labels follow the event stream; the button and keys send commands.
+    Given a cycler it talks to it in process; otherwise to the daemon at url.
+    """
+
+    def __init__(self, root, bridge, url=None, timer=None, cycler=None):
+        import tkinter as tk
+        self.root       = root
+        self.bridge     = bridge
+        self.url        = url
+        root.title("NBA + MLB Cycler")
+        self.lbl1       = tk.Label(root, text="Opening, please wait…", font=("Arial",16))
+        self.lbl1.pack(pady=8)
+        self.lbl2       = tk.Label(root, text="",             font=("Arial",14))
+        self.lbl2.pack(pady=4)
+        tk.Button(root, text="Next Game", command=lambda: self.send("next")).pack(pady=10)
+        tk.Button(root, text="Rundown", command=lambda: self.send("rundown")).pack(pady=(0, 10))
+        self.lbl_trace  = tk.Label(root, text="", font=("Consolas",9), justify="left")
+        self._overlay   = False
+        if TRACE_OVERLAY:
+            self._toggle_overlay()
+        root.bind("<F2>", lambda _e: self._toggle_overlay())
+        root.bind("<F3>", lambda _e: self.send("next_feed"))
+        root.bind("<F4>", lambda _e: self.send("rundown"))
+        if timer:
+            timer.mark("window built")
+            root.after(0, timer.mark, "window shown")
+
+        self.client     = LocalClient(cycler, self._on_event) if cycler \
+            else ControlClient(url, self._on_event)
+        bridge.loop.call_soon_threadsafe(self.client.start)
+
+    def send(self, cmd, **args):
+        """Send a command to the cycler; safe from any thread."""
+        self.bridge.to_loop(self.client.send(cmd, **args))
+
+    async def close(self):
+        await self.client.close()
+
+    def _on_event(self, event):
+        # client callback, on the loop thread → hop to Tk
+        if event["type"] == "phases":
+            self.bridge.to_ui(self._show_phases, event["phases"], key="phases")
+        else:
+            self.bridge.to_ui(self._apply, event)
+
+    def _apply(self, event):
+        kind = event["type"]
+        if kind == "status":
+            if event["current"]:
+                self._show_game(event["current"])
+            elif event["state"] == "loading":
+                self._show_loading()
+        elif kind == "current":
+            self._show_game(event["game"])
+        elif kind == "loading":
+            self._show_loading()
+        elif kind == "disconnected":
+            self.lbl2.config(text=f"Waiting for {self.url}…")
+
+    def _show_game(self, g):
+        self.lbl1.config(text=g["match"])
+        self.lbl2.config(text=f"{g['status_line']}\n{g['score_line']}".strip())
+
+    def _show_loading(self):
+        self.lbl1.config(text="Loading next game…")
+        self.lbl2.config(text="")
 
-        league, g = self.current
-        open_stream = False
-        now = datetime.now().astimezone()
-
-        # — NBA —
-        if league == "NBA":
-            code = g.get("gameStatus", 1)  # 1=Scheduled, 2=Live, 3=Final
-            away, home = g["awayTeam"], g["homeTeam"]
-            match = f"{away['teamCity']} {away['teamName']} at {home['teamCity']} {home['teamName']}"
-
-            if code == 1:
-                # Scheduled
-                start_txt = g.get("gameStatusText", "").strip()
-                status = f"Starts at {start_txt}"
-                score = ""
-
-                # if we have ISO start time, open once we're within 45 min before it
-                dt_str = g.get("gameDate")
-                if dt_str:
-                    try:
-                        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
-                        # as soon as now >= (dt - 45min), flag open
-                        if now >= dt - timedelta(minutes=45):
-                            open_stream = True
-                    except Exception:
-                        pass
-
-            elif code == 2:
-                # Live
-                status = parse_nba_status(g.get("gameStatusText", ""))
-                hs, as_ = home.get("score", 0), away.get("score", 0)
-                if hs >= as_:
-                    ln, ls, tn, ts = home["teamName"], hs, away["teamName"], as_
-                else:
-                    ln, ls, tn, ts = away["teamName"], as_, home["teamName"], hs
-                score = f"{ln} {ls}, {tn} {ts}"
-                open_stream = True
-
-            else:  # code == 3 → Final
-                status = "Final"
-                hs, as_ = home.get("score", 0), away.get("score", 0)
-                if hs >= as_:
-                    ln, ls, tn, ts = home["teamName"], hs, away["teamName"], as_
-                else:
-                    ln, ls, tn, ts = away["teamName"], as_, home["teamName"], hs
-                score = f"{ln} {ls}, {tn} {ts}"
-
-        # — MLB —
+    def _toggle_overlay(self):
+        self._overlay = not self._overlay
+        if self._overlay:
+            self.lbl_trace.pack(pady=4)
         else:
-            state = g.get("status", {}).get("abstractGameState", "Preview")
-            away, home = g["teams"]["away"], g["teams"]["home"]
-            match = f"{away['team']['name']} at {home['team']['name']}"
-
-            if state == "Preview":
-                # Scheduled
-                dt_str = g.get("gameDate")
-                if dt_str:
-                    try:
-                        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
-                        start_str = dt.strftime("%I:%M %p").lstrip("0")
-                    except Exception:
-                        start_str = g.get("status", {}).get("detailedState", "Scheduled")
-                else:
-                    start_str = g.get("status", {}).get("detailedState", "Scheduled")
-                status = f"Scheduled at {start_str}"
-                score = ""
-
-                # open once within 45 min of start
-                if dt_str:
-                    try:
-                        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
-                        if now >= dt - timedelta(minutes=45):
-                            open_stream = True
-                    except Exception:
-                        pass
-
-            elif state == "Live":
-                # Live
-                status = g["status"].get("detailedState", "Live")
-                hs, as_ = home.get("score", 0), away.get("score", 0)
-                if hs >= as_:
-                    ln, ls, tn, ts = home["team"]["name"], hs, away["team"]["name"], as_
-                else:
-                    ln, ls, tn, ts = away["team"]["name"], as_, home["team"]["name"], hs
-                score = f"{ln} {ls}, {tn} {ts}"
-                open_stream = True
+            self.lbl_trace.pack_forget()
 
-            else:
-                # Final
-                status = "Final"
-                hs, as_ = home.get("score", 0), away.get("score", 0)
-                if hs >= as_:
-                    ln, ls, tn, ts = home["team"]["name"], hs, away["team"]["name"], as_
-                else:
-                    ln, ls, tn, ts = away["team"]["name"], as_, home["team"]["name"], hs
-                score = f"{ln} {ls}, {tn} {ts}"
-
-        # — Update UI —
-        self.lbl1.config(text=match)
-        self.lbl2.config(text=f"{status}\n{score}".strip())
-
-        # — Speak in background —
-        threading.Thread(
-            target=self._speak_all,
-            args=(match, status, score),
-            daemon=True
-        ).start()
-
-        # — Open stream if flagged —
-        if open_stream:
-            if league == "NBA":
-                url = (
-                    f"https://www.nba.com/game/"
-                    f"{away['teamTricode']}-vs-{home['teamTricode']}-{g['gameId']}?watch"
-                )
-                mgr = self.nba_mgr
-            else:
-                url = f"https://www.mlb.com/tv/g{g['gamePk']}"
-                mgr = self.mlb_mgr
-            asyncio.run_coroutine_threadsafe(mgr.open(url), self.loop)
-            self.last_mgr = mgr
+    def _show_phases(self, phases):
+        self.lbl_trace.config(text="\n".join(f"{name:<14}{ms:>8.0f} ms" for name, ms in phases))
 
-    def _speak_all(self, match, status, score):
-        playSound(match)
-        playSound(status)
-        if score:
-            playSound(score)
 
-if __name__ == "__main__":
-    kill_edge()
-    root = tk.Tk()
-    game = GameCycler(root)
+def run_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def run_window(connect, host, port):
+    """The Tk window, over an in-process cycler unless connect names a daemon."""
+    import tkinter as tk
+    timer  = StageTimer()
+    root   = tk.Tk()
+    loop   = asyncio.new_event_loop()
+    threading.Thread(target=run_loop, args=(loop,), daemon=True, name="loop").start()
+    bridge = LoopBridge(root, loop)
+    bridge.start()
+
+    cycler = None
+    if not connect:
+        # the window talks to it directly; the control API is only for others
+        cycler = GameCycler(loop, bridge, timer)
+        bridge.to_loop(cycler.start(host, port))
+    window = CyclerWindow(root, bridge, connect, timer, cycler)
 
     # start listening to the controller
-    controller_thread = threading.Thread(
-        target=controller_loop,
-        args=(game,),
-        daemon=True
-    )
-    controller_thread.start()
+    threading.Thread(target=controller_loop, args=(window.send,), daemon=True).start()
     root.mainloop()
+
+    # close browsers and pooled connections before the loop thread dies with the process
+    try:
+        bridge.to_loop(window.close()).result(timeout=2)
+        if cycler:
+            bridge.to_loop(cycler.shutdown()).result(timeout=10)
+    except Exception:
+        if cycler:
+            cycler.browser.processes.terminate()
+
+
+def run_daemon(host, port):
+    """The cycler with no window, driven through the control API until signalled."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")   # joystick events without a display
+
+    async def serve():
+        loop   = asyncio.get_running_loop()
+        bridge = LoopBridge(None, loop)
+        bridge.start()
+        cycler = GameCycler(loop, bridge)
+        stop   = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass   # Windows: Ctrl+C cancels serve() instead
+        threading.Thread(target=controller_loop, daemon=True,
+                         args=(lambda action: loop.call_soon_threadsafe(cycler.command, action),)
+                         ).start()
+        try:
+            await cycler.start(host, port, need_api=True)
+            await stop.wait()
+        finally:
+            await cycler.shutdown()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        raise SystemExit(f"Control API can't listen on {host}:{port}: {e}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cycle through NBA and MLB games and stream their audio.")
+    ap.add_argument("--daemon", action="store_true",
+                    help="run headless; drive it through the control API")
+    ap.add_argument("--connect", metavar="URL",
+                    help="open just the window, as a client of the daemon at URL")
+    ap.add_argument("--host", default=CONTROL_HOST,
+                    help="control API address (0.0.0.0 to drive this box from elsewhere)")
+    ap.add_argument("--port", type=int, default=CONTROL_PORT)
+    args = ap.parse_args()
+
+    if REPLAY_URL:
+        point_at(REPLAY_URL)
+        dbg("Scoreboards and stream pages from replay server", REPLAY_URL)
+    if args.daemon:
+        run_daemon(args.host, args.port)
+    else:
+        run_window(args.connect, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
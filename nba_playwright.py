@@ -2,12 +2,12 @@ def load_next_game(self):
     if not self.games:
         return
 
-    # Fetch new game data first
-    asyncio.run_coroutine_threadsafe(self.fetch_games(), self.loop)
+    # Fetch new game data first; the next game is shown once it lands,
+    # without blocking the Tk thread
+    self.bridge.to_loop(self.fetch_games(), then=lambda _r: self.show_next_game())
 
-    # Wait for the game data to update
-    time.sleep(2)  # Optionally, adjust the sleep time based on the fetching delay
 
+def show_next_game(self):
     # Check if there are no games after fetch
     if len(self.games) == 0:
         playSound("No more games available.")
@@ -23,16 +23,17 @@ def load_next_game(self):
 async def fetch_games(self):
     """Fetches the live game data from the NBA API."""
     url = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.text()
-                    self.process_game_data(json.loads(data))
-                else:
-                    messagebox.showerror("Error", "Failed to fetch game data.")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {e}")
+    try:
+        data = await self.http.get_json(url)
+    except aiohttp.ClientResponseError:
+        dbg("Failed to fetch game data.")
+        self.bridge.to_ui(self.game_info_label.config, {"text": "Failed to fetch game data."})
+        return
+    except Exception as e:
+        dbg("NBA fetch error:", e)
+        self.bridge.to_ui(self.game_info_label.config, {"text": f"An error occurred: {e}"})
+        return
+    self.bridge.to_ui(self.process_game_data, data)
 
 
 def process_game_data(self, data):
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import time
+
+from common import dbg
+
+RECIPE_DAYS = 14   # recipes for games not opened in this long are dropped
+
+
+class RecipeBook:
+    """How audio got started last time, per game (gamePk/gameId).
+
+    MLB recipes hold "feeds", the audio-feed labels the broadcast selector
+    offered, and "feed", the index of the one in use; NBA recipes hold
+    "button", the play button ("watch" or "listen") that worked. The file is
+    read on first use and rewritten after each change, both off the loop;
+    each StreamManager keeps its own in its profile directory.
+    """
+
+    def __init__(self, path, keep_days=RECIPE_DAYS):
+        self.path      = path
+        self.keep_days = keep_days
+        self._recipes  = None   # str(game id) -> recipe, loaded lazily
+        self._lock     = asyncio.Lock()
+
+    def _read(self):
+        try:
+            recipes = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            dbg("stream recipes ignored:", e)
+            return {}
+        cutoff = time.time() - self.keep_days * 86400
+        return {k: r for k, r in recipes.items() if r.get("seen", 0) >= cutoff}
+
+    async def get(self, game_id):
+        """A copy of the recipe for game_id ({} if none or no id)."""
+        if game_id is None:
+            return {}
+        async with self._lock:
+            if self._recipes is None:
+                self._recipes = await asyncio.to_thread(self._read)
+            return dict(self._recipes.get(str(game_id), {}))
+
+    async def update(self, game_id, **fields):
+        """Merge fields into game_id's recipe and save."""
+        if game_id is None:
+            return
+        async with self._lock:
+            if self._recipes is None:
+                self._recipes = await asyncio.to_thread(self._read)
+            recipe = self._recipes.setdefault(str(game_id), {})
+            if all(recipe.get(k) == v for k, v in fields.items()):
+                recipe["seen"] = time.time()
+                return   # nothing new; skip the write
+            recipe.update(fields, seen=time.time())
+            text = json.dumps(self._recipes)
+        try:
+            await asyncio.to_thread(self.path.write_text, text)
+        except Exception as e:
+            dbg("stream recipes write failed:", e)
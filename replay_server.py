@@ -0,0 +1,357 @@
+"""Local stand-in for the NBA/MLB endpoints and stream pages.
+
+Serves a recorded day of scoreboard payloads as a timed sequence, the live
+games' own feeds (NBA play-by-play, MLB feed/live and its diffPatch deltas)
+on the same clock, plus fixture pages that walk through the same consent,
+sign-in and "Watch Live" / "Broadcast selector" steps StreamManager drives on
+the real sites.
+
+    python replay_server.py serve fixtures/replay/sample_day.json --port 8765
+    SS_REPLAY_URL=http://127.0.0.1:8765 python main.py
+
+    python replay_server.py record my_day.json --minutes 90   # capture a real slate
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import struct
+import time
+import wave
+from datetime import date as Date, datetime, timedelta
+
+from common import PROJECT_DIR, dbg
+
+FIXTURES_DIR = PROJECT_DIR / "fixtures"
+PAGES_DIR    = FIXTURES_DIR / "pages"
+SAMPLE_DAY   = FIXTURES_DIR / "replay" / "sample_day.json"
+
+# timestamps shifted by whole days so a recorded slate plays as today's
+_TIME_KEYS = ("gameDate", "gameTimeUTC")
+_DATE_KEYS = ("officialDate", "date")
+
+
+def tone_wav(seconds=1.0, rate=8000, freq=440):
+    """A short mono sine tone; fixture players loop it as the "broadcast"."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * freq * i / rate)))
+            for i in range(int(seconds * rate))))
+    return buf.getvalue()
+
+
+def json_diff(a, b, path=""):
+    """RFC 6902 ops turning a into b: the inverse of live.json_patch, enough
+    for recorded feeds (appended list items become "add"s, the rest "replace")."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        ops = []
+        for k in a.keys() - b.keys():
+            ops.append({"op": "remove", "path": f"{path}/{_escape(k)}"})
+        for k, v in b.items():
+            sub = f"{path}/{_escape(k)}"
+            ops.extend(json_diff(a[k], v, sub) if k in a else [{"op": "add", "path": sub, "value": v}])
+        return ops
+    if isinstance(a, list) and isinstance(b, list) and len(b) >= len(a):
+        ops = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            ops.extend(json_diff(x, y, f"{path}/{i}"))
+        ops.extend({"op": "add", "path": f"{path}/-", "value": v} for v in b[len(a):])
+        return ops
+    return [] if a == b else [{"op": "replace", "path": path, "value": b}]
+
+
+def _escape(key):
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def rebase(obj, days, day=None):
+    """Copy of a recorded payload moved by days; date fields become day if given."""
+    if isinstance(obj, list):
+        return [rebase(v, days, day) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    out = {}
+    for k, v in obj.items():
+        if k in _TIME_KEYS and isinstance(v, str) and days:
+            try:
+                v = (datetime.fromisoformat(v.replace("Z", "+00:00")) + timedelta(days=days))\
+                    .isoformat().replace("+00:00", "Z")
+            except ValueError:
+                pass
+        elif k in _DATE_KEYS and isinstance(v, str) and day:
+            v = day
+        else:
+            v = rebase(v, days, day)
+        out[k] = v
+    return out
+
+
+class Recording:
+    """A recorded day: per league, frames of {"at": seconds, "payload": …}.
+
+    The frame served is the last one whose "at" has passed since start(),
+    scaled by speed; the final frame holds. MLB frames carry every recorded
+    date, and a request for a date gets just that date's games. "live" holds
+    the same kind of frames per league and game id, for the live feeds.
+    """
+
+    def __init__(self, data, speed=1.0):
+        self.today  = data["today"]
+        self.frames = {league: sorted(frames, key=lambda f: f["at"])
+                       for league, frames in data.items() if league not in ("today", "live")}
+        self.live   = {league: {gid: sorted(frames, key=lambda f: f["at"])
+                                for gid, frames in games.items()}
+                       for league, games in data.get("live", {}).items()}
+        self.speed  = speed
+        self.t0     = time.monotonic()
+
+    @classmethod
+    def load(cls, path, speed=1.0):
+        return cls(json.loads(path.read_text()), speed)
+
+    def start(self):
+        self.t0 = time.monotonic()
+
+    def _index(self, frames):
+        elapsed = (time.monotonic() - self.t0) * self.speed
+        idx = 0
+        for i, f in enumerate(frames):
+            if f["at"] <= elapsed:
+                idx = i
+        return idx
+
+    def frame(self, league):
+        """(index, payload) of league's current frame."""
+        frames = self.frames[league]
+        idx    = self._index(frames)
+        return idx, frames[idx]["payload"]
+
+    def live_frames(self, league, game_id):
+        """(index of the current frame, all frames) of a game's live feed; KeyError if unrecorded."""
+        frames = self.live[league][str(game_id)]
+        return self._index(frames), frames
+
+    def shift(self):
+        """Days between the recorded today and the real one."""
+        return (Date.today() - Date.fromisoformat(self.today)).days
+
+
+def _etagged(request, tag, payload):
+    from aiohttp import web
+    if request.headers.get("If-None-Match") == tag:
+        return web.Response(status=304, headers={"ETag": tag})
+    return web.json_response(payload, headers={"ETag": tag})
+
+
+def make_app(recording, latency_ms=0, hydrate_ms=150):
+    """aiohttp app serving recording plus the fixture pages."""
+    from aiohttp import web
+
+    tone  = tone_wav()
+    pages = {p.stem: p.read_text(encoding="utf-8") for p in PAGES_DIR.glob("*.html")}
+    stats = {"api": 0, "not_modified": 0, "pages": 0}
+
+    async def delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    async def nba_scoreboard(request):
+        await delay()
+        stats["api"] += 1
+        idx, payload = recording.frame("nba")
+        days = recording.shift()
+        tag  = f'"nba-{idx}-{days}"'
+        resp = _etagged(request, tag, rebase(payload, days))
+        stats["not_modified"] += resp.status == 304
+        return resp
+
+    async def mlb_schedule(request):
+        await delay()
+        stats["api"] += 1
+        idx, payload = recording.frame("mlb")
+        days = recording.shift()
+        want = request.query.get("date") or Date.today().isoformat()
+        # the recorded date that plays the part of the requested one
+        rec  = (Date.fromisoformat(want) - timedelta(days=days)).isoformat()
+        dates = [rebase(d, days, want) for d in payload.get("dates", []) if d.get("date") == rec]
+        tag  = f'"mlb-{idx}-{days}-{want}"'
+        resp = _etagged(request, tag, {"dates": dates})
+        stats["not_modified"] += resp.status == 304
+        return resp
+
+    def live(league, request):
+        try:
+            return recording.live_frames(league, request.match_info["id"])
+        except KeyError:
+            raise web.HTTPNotFound()
+
+    async def nba_playbyplay(request):
+        await delay()
+        stats["api"] += 1
+        idx, frames = live("nba", request)
+        days = recording.shift()
+        resp = _etagged(request, f'"pbp-{request.match_info["id"]}-{idx}-{days}"',
+                        rebase(frames[idx]["payload"], days))
+        stats["not_modified"] += resp.status == 304
+        return resp
+
+    async def mlb_feed(request):
+        await delay()
+        stats["api"] += 1
+        idx, frames = live("mlb", request)
+        return web.json_response(rebase(frames[idx]["payload"], recording.shift()))
+
+    async def mlb_diff(request):
+        # one {"diff": ops} per recorded step since startTimecode; an unknown
+        # timecode gets the full feed, as the real endpoint does when too far behind
+        await delay()
+        stats["api"] += 1
+        idx, frames = live("mlb", request)
+        days  = recording.shift()
+        stamp = request.query.get("startTimecode")
+        start = next((i for i, f in enumerate(frames[:idx + 1])
+                      if f["payload"]["metaData"]["timeStamp"] == stamp), None)
+        if start is None:
+            return web.json_response(rebase(frames[idx]["payload"], days))
+        steps = [rebase(f["payload"], days) for f in frames[start:idx + 1]]
+        return web.json_response([{"diff": json_diff(a, b)} for a, b in zip(steps, steps[1:])])
+
+    def page(name):
+        async def handler(request):
+            await delay()
+            stats["pages"] += 1
+            html = pages[name].replace("{{hydrate_ms}}", str(hydrate_ms))
+            return web.Response(text=html, content_type="text/html")
+        return handler
+
+    async def media(request):
+        return web.Response(body=tone, content_type="audio/wav")
+
+    async def status(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get("/nba/api/static/json/liveData/scoreboard/todaysScoreboard_00.json",
+                       nba_scoreboard)
+    app.router.add_get("/mlb/api/api/v1/schedule", mlb_schedule)
+    app.router.add_get("/nba/api/static/json/liveData/playbyplay/playbyplay_{id}.json",
+                       nba_playbyplay)
+    app.router.add_get("/mlb/api/api/v1.1/game/{id}/feed/live", mlb_feed)
+    app.router.add_get("/mlb/api/api/v1.1/game/{id}/feed/live/diffPatch", mlb_diff)
+    app.router.add_get("/nba/site/game/{slug}", page("nba_game"))
+    app.router.add_get("/nba/site/account/sign-in", page("nba_sign_in"))
+    app.router.add_get("/mlb/site/tv/{slug}", page("mlb_tv"))
+    app.router.add_get("/media/tone.wav", media)
+    app.router.add_get("/_status", status)
+    app["stats"] = stats
+    return app
+
+
+async def start(recording, host="127.0.0.1", port=0, **kwargs):
+    """Serve on the running loop; returns (runner, base_url). Port 0 picks a free one."""
+    from aiohttp import web
+    runner = web.AppRunner(make_app(recording, **kwargs), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    host, port = runner.addresses[0][:2]
+    recording.start()
+    return runner, f"http://{host}:{port}"
+
+
+async def record(path, minutes, interval):
+    """Poll the real endpoints and save every changed payload as a frame."""
+    from http_client import HttpClient
+    from leagues import LEAGUES, Status
+    from scoreboard import ScoreboardCache
+
+    http   = HttpClient()
+    cache  = ScoreboardCache(http)
+    today  = cache.today()
+    out    = {"today": today, "nba": [], "mlb": [], "live": {"nba": {}, "mlb": {}}}
+    last   = {}
+    t0     = time.monotonic()
+    try:
+        while time.monotonic() - t0 < minutes * 60:
+            at = round(time.monotonic() - t0, 1)
+            for name, adapter in LEAGUES.items():
+                league = name.lower()
+                try:
+                    if adapter.dated:
+                        dates = []
+                        for d in cache.window(name, today):
+                            dates.extend((await http.get_json(adapter.scoreboard_url(d))).get("dates", []))
+                        payload = {"dates": dates}
+                    else:
+                        payload = await http.get_json(adapter.scoreboard_url(today))
+                except Exception as e:
+                    dbg(f"{name} record error:", e)
+                    continue
+                if payload != last.get(league):
+                    last[league] = payload
+                    out[league].append({"at": at, "payload": payload})
+                    dbg(f"{name} frame {len(out[league])} at {at}s")
+                # each live game's own feed, for the live trackers
+                for g in adapter.parse(payload, today):
+                    if g.status != Status.LIVE or not adapter.live_url(g.id):
+                        continue
+                    try:
+                        feed = await http.get_json(adapter.live_url(g.id))
+                    except Exception as e:
+                        dbg(f"{name} {g.id} live record error:", e)
+                        continue
+                    frames = out["live"][league].setdefault(str(g.id), [])
+                    if not frames or frames[-1]["payload"] != feed:
+                        frames.append({"at": at, "payload": feed})
+            path.write_text(json.dumps(out))
+            await asyncio.sleep(interval)
+    finally:
+        await http.close()
+
+
+def main():
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("serve", help="replay a recording")
+    s.add_argument("recording", nargs="?", default=str(SAMPLE_DAY))
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--speed", type=float, default=1.0, help="recording seconds per real second")
+    s.add_argument("--latency-ms", type=int, default=0, help="added to every API/page response")
+    s.add_argument("--hydrate-ms", type=int, default=150, help="delay before fixture buttons render")
+
+    r = sub.add_parser("record", help="capture the real endpoints into a recording")
+    r.add_argument("out")
+    r.add_argument("--minutes", type=float, default=60)
+    r.add_argument("--interval", type=float, default=15)
+
+    args = ap.parse_args()
+    from pathlib import Path
+
+    if args.cmd == "record":
+        asyncio.run(record(Path(args.out), args.minutes, args.interval))
+        return
+
+    async def serve():
+        rec = Recording.load(Path(args.recording), args.speed)
+        runner, base = await start(rec, args.host, args.port,
+                                   latency_ms=args.latency_ms, hydrate_ms=args.hydrate_ms)
+        dbg(f"Replaying {args.recording} at {base} (recorded {rec.today}, shifted {rec.shift()} days)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
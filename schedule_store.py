@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import date as Date, timedelta
+
+from common import BASE_DIR, dbg
+from leagues import LEAGUES
+
+SCHEDULE_DB = BASE_DIR / "schedule.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    league     TEXT    NOT NULL,
+    date       TEXT    NOT NULL,
+    id         TEXT    NOT NULL,
+    raw        TEXT    NOT NULL,
+    fetched_at REAL    NOT NULL,
+    PRIMARY KEY (league, date, id)
+)
+"""
+
+
+def shift(day, days):
+    """YYYY-MM-DD plus days."""
+    return (Date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+class ScheduleStore:
+    """SQLite copy of each league's schedule over a rolling window of dates.
+
+    Rows hold the raw per-game payload, so a cached slate is rebuilt through
+    the same adapter as a fresh one. Saving a (league, date) replaces that
+    date wholesale; dates older than keep_days are dropped on every save.
+    Calls block on disk I/O — run them off the event loop.
+    """
+
+    def __init__(self, path=SCHEDULE_DB, keep_days=2):
+        self.path      = path
+        self.keep_days = keep_days
+        self._lock     = threading.Lock()
+        self._db       = None
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def save(self, league, date, raw_games):
+        """Replace league's games for date with raw_games, then trim old dates."""
+        adapter, now = LEAGUES[league], time.time()
+        rows = [(league, date, str(adapter.game(g, date).id), json.dumps(g), now)
+                for g in raw_games]
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute("DELETE FROM games WHERE league = ? AND date = ?", (league, date))
+                db.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)", rows)
+                db.execute("DELETE FROM games WHERE date < ?", (shift(date, -self.keep_days),))
+
+    def games(self, league, start, end):
+        """Cached Game records for league with start <= date <= end, oldest date first."""
+        adapter = LEAGUES[league]
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT date, raw FROM games WHERE league = ? AND date BETWEEN ? AND ?"
+                " ORDER BY date", (league, start, end)).fetchall()
+        out = []
+        for day, raw in rows:
+            try:
+                out.append(adapter.game(json.loads(raw), day))
+            except Exception as e:
+                dbg(f"{league} cached game unreadable:", e)
+        return out
+
+    def age(self, league, date):
+        """Seconds since league's date was last saved, or None if never."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT MAX(fetched_at) FROM games WHERE league = ? AND date = ?",
+                (league, date)).fetchone()
+        return None if row[0] is None else time.time() - row[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from datetime import datetime
+
+from common import dbg
+from leagues import LEAGUES, Status
+from schedule_store import shift
+from tracing import tracer
+
+
+class Snapshot:
+    """One league's scoreboard at a point in time, indexed by game id."""
+
+    __slots__ = ("league", "date", "fetched_at", "games", "by_id")
+
+    def __init__(self, league, date, games):
+        self.league     = league
+        self.date       = date
+        self.fetched_at = time.monotonic()
+        self.games      = games
+        self.by_id      = {g.id: g for g in games}
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+
+class ScoreboardCache:
+    """Per-(league, date) snapshot cache with a short TTL.
+
+    Concurrent callers asking for the same stale snapshot share a single
+    in-flight fetch instead of each starting their own download. With a
+    store, every fetched date is also written through to disk.
+    """
+
+    def __init__(self, http, ttl=5.0, store=None, adjacent_ttl=300.0):
+        self.http         = http
+        self.ttl          = ttl
+        self.store        = store
+        self.adjacent_ttl = adjacent_ttl   # yesterday/tomorrow, while nothing there is live
+        self._snaps       = {}   # (league, date) -> Snapshot
+        self._inflight    = {}   # (league, date) -> asyncio.Task
+
+    @staticmethod
+    def today():
+        return datetime.now().strftime("%Y-%m-%d")
+
+    def window(self, league, today=None):
+        """Schedule dates worth fetching for league: yesterday, today, tomorrow."""
+        today = today or self.today()
+        if not LEAGUES[league].dated:
+            return [today]
+        return [shift(today, -1), today, shift(today, 1)]
+
+    async def slate(self, league, max_age=None):
+        """Games across league's window that belong on today's slate.
+
+        Adjacent dates are refetched on the slower adjacent_ttl unless their
+        last snapshot had a live game. A game filed under two dates (a
+        postponement) keeps its latest entry.
+        """
+        today, now = self.today(), datetime.now().astimezone()
+        dates = self.window(league, today)
+        snaps = await asyncio.gather(
+            *(self.get(league, d, max_age if d == today else self._adjacent_age(league, d, max_age))
+              for d in dates),
+            return_exceptions=True)
+        games = {}
+        for day, snap in zip(dates, snaps):
+            if isinstance(snap, Exception):
+                if day == today:
+                    raise snap
+                dbg(f"{league} {day} fetch error:", snap)
+                continue
+            for g in snap.games:
+                if g.in_slate(today, now):
+                    games[g.id] = g
+        return list(games.values())
+
+    def _adjacent_age(self, league, date, max_age):
+        snap = self._snaps.get((league, date))
+        if snap and any(g.status == Status.LIVE for g in snap.games):
+            return max_age
+        return self.adjacent_ttl
+
+    async def get(self, league, date=None, max_age=None):
+        """Return a snapshot no older than max_age (defaults to the TTL)."""
+        key  = (league, date or self.today())
+        snap = self._snaps.get(key)
+        if snap and snap.age() < (self.ttl if max_age is None else max_age):
+            return snap
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(*key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        # shield so one cancelled waiter doesn't kill the fetch for the others
+        return await asyncio.shield(task)
+
+    async def game(self, league, game_id, date=None):
+        """Look up one game by id, refetching only if the snapshot is stale."""
+        snap = await self.get(league, date)
+        return snap.by_id.get(game_id)
+
+    def peek(self, league, date=None):
+        """Latest snapshot regardless of age, or None; never touches the network."""
+        return self._snaps.get((league, date or self.today()))
+
+    async def _fetch(self, league, date):
+        adapter = LEAGUES[league]
+        with tracer.span("scoreboard.fetch", league=league, date=date):
+            data  = await self.http.get_json(adapter.scoreboard_url(date))
+            games = adapter.parse(data, date)
+        snap    = Snapshot(league, date, games)
+        dbg(f"{league} snapshot {date}: {len(games)} games;", self.http.stats_line())
+        self._snaps[(league, date)] = snap
+        if self.store:
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.store.save, league, date, adapter.entries(data))
+            except Exception as e:
+                dbg(f"{league} schedule store write failed:", e)
+        return snap
+
+
+class ScoreboardPoller:
+    """Background refresh of every league's slate that reports only changed games.
+
+    on_change(league, games, gone) runs on the event loop with the list of
+    Game records whose fingerprint moved (or which are new) since the last
+    poll, and the ids of games that have dropped off the slate. The
+    interval adapts to the slate: fast while anything is live, slow while games
+    are only scheduled, near-idle when nothing is on.
+    """
+
+    def __init__(self, cache, on_change, leagues=tuple(LEAGUES),
+                 live_interval=15, scheduled_interval=120, idle_interval=900):
+        self.cache              = cache
+        self.on_change          = on_change
+        self.leagues            = leagues
+        self.live_interval      = live_interval
+        self.scheduled_interval = scheduled_interval
+        self.idle_interval      = idle_interval
+        self._prints            = {league: {} for league in leagues}
+        self._task              = None
+
+    def seed(self, league, games):
+        """Record games the caller already knows about so they don't diff as new."""
+        self._prints[league] = {g.id: g.fingerprint() for g in games}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            phases = set()
+            for league in self.leagues:
+                try:
+                    games = await self.cache.slate(league, max_age=0)
+                except Exception as e:
+                    dbg(f"{league} poll error:", e)
+                    continue
+                phases.update(g.status for g in games)
+                changed, gone = self._diff(league, games)
+                if changed or gone:
+                    dbg(f"{league} poll: {len(changed)} changed, {len(gone)} gone")
+                    self.on_change(league, changed, gone)
+            await asyncio.sleep(self.interval_for(phases))
+
+    def _diff(self, league, games):
+        """(games that changed or are new, ids no longer on the slate)."""
+        prev, now, changed = self._prints[league], {}, []
+        for g in games:
+            now[g.id] = fp = g.fingerprint()
+            if prev.get(g.id) != fp:
+                changed.append(g)
+        self._prints[league] = now
+        # e.g. yesterday's finals once the window moves past midnight
+        return changed, [gid for gid in prev if gid not in now]
+
+    def interval_for(self, phases):
+        if Status.LIVE in phases:
+            return self.live_interval
+        if Status.SCHEDULED in phases:
+            return self.scheduled_interval
+        return self.idle_interval
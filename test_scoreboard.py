@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime
+
+from leagues import Game, Status
+from scoreboard import ScoreboardPoller
+
+
+def game(gid, status=Status.FINAL, away=1, home=2):
+    return Game("NBA", gid, "2025-05-02", status, "", datetime.now().astimezone(),
+                "Celtics", "Knicks", "BOS", "NYK", away, home, f"match {gid}", "Final", "")
+
+
+class FakeCache:
+    """Serves one slate per poll; the last one holds."""
+
+    def __init__(self, slates):
+        self.slates = list(slates)
+
+    async def slate(self, league, max_age=None):
+        return self.slates.pop(0) if len(self.slates) > 1 else self.slates[0]
+
+
+def test_poller_reports_games_that_drop_off_the_slate():
+    calls = []
+    first = [game(1), game(2, Status.LIVE)]
+    cache = FakeCache([first, [game(2, Status.LIVE, 3, 2), game(3, Status.LIVE)]])
+    poller = ScoreboardPoller(cache, lambda *args: calls.append(args),
+                              leagues=("NBA",), live_interval=0.01)
+    poller.seed("NBA", first)
+
+    async def run():
+        poller.start()
+        await asyncio.sleep(0.1)
+        poller.stop()
+
+    asyncio.run(run())
+    league, changed, gone = calls[0]
+    assert league == "NBA"
+    assert [g.id for g in changed] == [2, 3]
+    assert gone == [1]
+    assert len(calls) == 1   # nothing moves after that
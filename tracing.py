@@ -0,0 +1,222 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from common import BASE_DIR, dbg
+
+SPAN_FILE      = BASE_DIR / "spans.jsonl"
+SPAN_FILE_MAX  = 5 * 1024 * 1024   # rotated to spans.jsonl.1 past this
+METRICS_PORT   = 9464
+
+# seconds; a game switch ranges from a cached lookup to a full sign-in
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_attrs = ContextVar("trace_attrs", default={})
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last slot is +Inf
+        self.sum    = 0.0
+        self.count  = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum       += seconds
+        self.count     += 1
+
+    def cumulative(self):
+        total = 0
+        for c in self.counts:
+            total += c
+            yield total
+
+
+class Tracer:
+    """Timed spans with attributes, kept as histograms and a recent-span ring.
+
+    span() works the same around sync and async code. Attributes set with
+    attrs() — switch generation, league, game id — flow into every span
+    opened under it, including in tasks started there. Histograms are keyed
+    by (span name, league); game ids stay on the spans only. Spans recorded
+    under warm=True (background page warming) get their own warm.* histograms.
+
+    Recording a span does no file I/O: spans are buffered and appended to
+    span_file in batches on the executor given to use_executor() (the
+    bridge's I/O pool), or on a worker of the tracer's own until then.
+    """
+
+    def __init__(self, span_file=SPAN_FILE, keep=512):
+        self.span_file  = span_file
+        self.recent     = deque(maxlen=keep)
+        self.hists      = {}      # (name, league) -> Histogram
+        self._lock      = threading.Lock()
+        self._listeners = []      # called with each finished switch id
+        self._runner    = None
+        self._unwritten = []      # spans not yet appended to span_file
+        self._flushing  = False   # a flush is queued or running
+        self._submit    = None    # fn -> future, for flushes
+        self._io_lock   = threading.Lock()
+
+    def use_executor(self, submit):
+        """Run span-file flushes through submit(fn), e.g. an executor's submit."""
+        self._submit = submit
+
+    @contextmanager
+    def attrs(self, **attrs):
+        token = _attrs.set({**_attrs.get(), **attrs})
+        try:
+            yield
+        finally:
+            _attrs.reset(token)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        start, error = time.perf_counter(), None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error=error, **attrs)
+
+    def record(self, name, seconds, **attrs):
+        """Record a span measured elsewhere (e.g. across threads)."""
+        attrs = {**_attrs.get(), **attrs}
+        if attrs.get("error") is None:
+            attrs.pop("error", None)
+        span = {"ts": round(time.time(), 3), "name": name, "ms": round(seconds * 1000, 2), **attrs}
+        key = (f"warm.{name}" if attrs.get("warm") else name, str(attrs.get("league", "")))
+        with self._lock:
+            self.recent.append(span)
+            self.hists.setdefault(key, Histogram()).observe(seconds)
+        self._write(span)
+
+    def observe(self, name, seconds, **attrs):
+        """Histogram-only sample: no span kept, nothing written; for frequent gauges."""
+        key = (name, str(attrs.get("league", "")))
+        with self._lock:
+            self.hists.setdefault(key, Histogram()).observe(seconds)
+
+    def _write(self, span):
+        if not self.span_file:
+            return
+        with self._lock:
+            self._unwritten.append(span)
+            if self._flushing:
+                return   # the queued flush picks this one up too
+            self._flushing = True
+        if self._submit is None:
+            self._submit = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spans").submit
+        try:
+            self._submit(self.flush)
+        except RuntimeError:
+            # executor shut down; close() writes what's left
+            with self._lock:
+                self._flushing = False
+
+    def flush(self):
+        """Append every buffered span to span_file; blocks, so keep it off the loop."""
+        while True:
+            with self._lock:
+                batch, self._unwritten = self._unwritten, []
+                if not batch:
+                    self._flushing = False
+                    break
+            self._append(batch)
+        with self._io_lock:
+            pass   # and a batch another thread is appending has landed
+
+    def _append(self, batch):
+        with self._io_lock:
+            if not self.span_file:
+                return
+            try:
+                if self.span_file.exists() and self.span_file.stat().st_size > SPAN_FILE_MAX:
+                    self.span_file.replace(self.span_file.with_suffix(".jsonl.1"))
+                with self.span_file.open("a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(s, default=str) + "\n" for s in batch))
+            except Exception as e:
+                dbg("span write failed:", e)
+                self.span_file = None
+
+    # — switches —
+
+    def switch_done(self, switch):
+        """Mark a switch finished; overlay listeners get its phase breakdown."""
+        for fn in list(self._listeners):
+            fn(switch)
+
+    def on_switch(self, fn):
+        self._listeners.append(fn)
+
+    def phases(self, switch):
+        """[(name, ms)] of every span recorded under switch, in finish order."""
+        with self._lock:
+            return [(s["name"], s["ms"]) for s in self.recent if s.get("switch") == switch]
+
+    # — export —
+
+    def prometheus(self):
+        lines = ["# HELP ss_span_seconds Duration of traced phases.",
+                 "# TYPE ss_span_seconds histogram"]
+        with self._lock:
+            items = sorted(self.hists.items())
+            for (name, league), h in items:
+                labels = f'span="{name}",league="{league}"'
+                for le, n in zip([*map(str, BUCKETS), "+Inf"], h.cumulative()):
+                    lines.append(f'ss_span_seconds_bucket{{{labels},le="{le}"}} {n}')
+                lines.append(f"ss_span_seconds_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"ss_span_seconds_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def histogram_lines(self):
+        """One JSON object per (span, league) histogram."""
+        with self._lock:
+            return "".join(
+                json.dumps({"span": name, "league": league, "count": h.count,
+                            "sum_ms": round(h.sum * 1000, 2),
+                            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], h.cumulative()))})
+                + "\n" for (name, league), h in sorted(self.hists.items()))
+
+    def span_lines(self):
+        with self._lock:
+            return "".join(json.dumps(s, default=str) + "\n" for s in self.recent)
+
+    async def serve(self, host="127.0.0.1", port=METRICS_PORT):
+        """/metrics (Prometheus text), /metrics.jsonl and /spans.jsonl on the running loop."""
+        from aiohttp import web
+
+        def text(fn, ctype):
+            async def handler(request):
+                return web.Response(text=fn(), content_type=ctype)
+            return handler
+
+        app = web.Application()
+        app.router.add_get("/metrics", text(self.prometheus, "text/plain"))
+        app.router.add_get("/metrics.jsonl", text(self.histogram_lines, "application/x-ndjson"))
+        app.router.add_get("/spans.jsonl", text(self.span_lines, "application/x-ndjson"))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        dbg(f"Metrics on http://{host}:{port}/metrics")
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        await asyncio.to_thread(self.flush)
+
+
+tracer = Tracer()
@@ -0,0 +1,477 @@
+import hashlib
+import heapq
+import importlib.util
+import io
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from common import PROJECT_DIR, dbg
+from tracing import tracer
+
+SPEECH_DIR = PROJECT_DIR / "speech_mp3s"
+
+FIXED_PROMPTS = ["Opening, please wait", "Loading next game", "Final"]
+
+# backends in order of preference; unavailable ones are skipped
+TTS_BACKENDS     = os.environ.get("SS_TTS", "gtts,espeak,pyttsx3").split(",")
+GTTS_TIMEOUT     = 4     # seconds before a slow Google round trip counts as a failure
+BACKEND_COOLDOWN = 60    # seconds a failed backend is passed over
+
+
+# — backends —
+
+class TTSBackend:
+    """Turns text into encoded audio bytes that pygame.mixer can load.
+
+    persist backends are slow or rate-limited, so their clips are also kept
+    in the disk tier; local ones are cheap enough to re-render.
+    """
+
+    name    = ""
+    ext     = "wav"
+    persist = False
+
+    def __init__(self):
+        self.stats      = {"ok": 0, "fail": 0, "seconds": 0.0}
+        self.down_until = 0.0
+
+    def available(self):
+        return True
+
+    def up(self):
+        return time.monotonic() >= self.down_until
+
+    def synth(self, text, lang):
+        raise NotImplementedError
+
+    def stats_line(self):
+        ok = self.stats["ok"]
+        avg = f"{self.stats['seconds'] / ok * 1000:.0f} ms avg" if ok else "unused"
+        return f"{self.name} ok={ok} fail={self.stats['fail']} {avg}"
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS: the nicest voice, one network round trip per phrase."""
+
+    name    = "gtts"
+    ext     = "mp3"
+    persist = True
+
+    def available(self):
+        return importlib.util.find_spec("gtts") is not None
+
+    def synth(self, text, lang):
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang, timeout=GTTS_TIMEOUT).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (or espeak) writing WAV to stdout; offline, tens of ms per phrase."""
+
+    name = "espeak"
+
+    def __init__(self):
+        super().__init__()
+        self.cmd = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self.cmd is not None
+
+    def synth(self, text, lang):
+        return subprocess.run([self.cmd, "--stdout", "-v", lang, "-s", "165", text],
+                              capture_output=True, timeout=10, check=True).stdout
+
+
+class Pyttsx3Backend(TTSBackend):
+    """The platform voice (SAPI5, NSSpeechSynthesizer, espeak) through pyttsx3.
+
+    pyttsx3 can only render to a file, so the clip goes through a temp file
+    and is read back into memory.
+    """
+
+    name = "pyttsx3"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()   # the driver isn't safe to drive from two threads
+
+    def available(self):
+        return importlib.util.find_spec("pyttsx3") is not None
+
+    def synth(self, text, lang):
+        import pyttsx3
+        fd, tmp = tempfile.mkstemp(suffix=".wav", prefix="ss-tts-")
+        os.close(fd)
+        try:
+            with self._lock:
+                engine = pyttsx3.init()
+                engine.save_to_file(text, tmp)
+                engine.runAndWait()
+            return Path(tmp).read_bytes()
+        finally:
+            os.unlink(tmp)
+
+
+BACKENDS = {b.name: b for b in (GTTSBackend, EspeakBackend, Pyttsx3Backend)}
+
+
+def default_backends(names=TTS_BACKENDS):
+    """Instances of the named backends that can run here, in order."""
+    out = []
+    for name in names:
+        cls = BACKENDS.get(name.strip())
+        if cls is None:
+            dbg("Unknown TTS backend:", name)
+            continue
+        b = cls()
+        if b.available():
+            out.append(b)
+    dbg("TTS backends:", ", ".join(b.name for b in out) or "none")
+    return out
+
+
+# — cache —
+
+class TTSCache:
+    """Content-addressed speech cache: text+lang → decoded pygame Sound.
+
+    Two tiers: an in-memory LRU of decoded clips, and a size-capped directory
+    of clips from persist backends that survives restarts. A miss on both
+    tiers goes to the backends in order; one that fails is passed over for
+    BACKEND_COOLDOWN, and a clip from a fallback is replaced once a preferred
+    backend is back.
+    """
+
+    def __init__(self, directory=SPEECH_DIR, max_clips=128, max_disk_bytes=50 * 1024 * 1024,
+                 backends=None):
+        self.dir            = directory
+        self.max_clips      = max_clips
+        self.max_disk_bytes = max_disk_bytes
+        self.backends       = backends if backends is not None else default_backends()
+        self._mem           = OrderedDict()   # key -> (backend rank, pygame.mixer.Sound)
+        self._lock          = threading.Lock()
+        self._key_locks     = {}              # key -> Lock while that phrase is being synthesized
+        self.stats          = {"mem_hit": 0, "disk_hit": 0, "miss": 0, "fallback": 0}
+        self._disk_bytes    = None            # measured on first write, off the startup path
+        self._prewarm_pool  = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prewarm")
+
+    def purge_legacy(self):
+        """Clear out uuid-named leftovers from before the cache existed."""
+        self.dir.mkdir(exist_ok=True)
+        for old in self.dir.glob("speech_*.mp3"):
+            try:
+                old.unlink()
+            except:
+                pass
+
+    @staticmethod
+    def key(text, lang="en"):
+        return hashlib.sha1(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+    def path(self, text, lang="en", ext="mp3"):
+        return self.dir / f"{self.key(text, lang)}.{ext}"
+
+    def _fresh(self, rank):
+        # a fallback clip is stale once a backend ahead of it is usable again
+        return not any(b.up() for b in self.backends[:rank])
+
+    def get(self, text, lang="en"):
+        """Return a decoded Sound for text, synthesizing it only on a full miss."""
+        import pygame
+        k = self.key(text, lang)
+        with self._lock:
+            entry = self._mem.get(k)
+            if entry is not None and self._fresh(entry[0]):
+                self._mem.move_to_end(k)
+                self.stats["mem_hit"] += 1
+                return entry[1]
+            klock = self._key_locks.setdefault(k, threading.Lock())
+
+        try:
+            with klock:
+                # another thread may have filled it while we waited
+                with self._lock:
+                    entry = self._mem.get(k)
+                if entry is not None and self._fresh(entry[0]):
+                    return entry[1]
+                rank, src = self.render(text, lang)
+                with tracer.span("tts.decode"):
+                    snd = pygame.mixer.Sound(str(src)) if isinstance(src, Path) \
+                        else pygame.mixer.Sound(file=io.BytesIO(src))
+                self._remember(k, rank, snd)
+                return snd
+        finally:
+            # once the clip is in _mem, later callers hit it before needing a lock;
+            # keeping one per phrase would grow with every score line of the day
+            with self._lock:
+                if self._key_locks.get(k) is klock:
+                    del self._key_locks[k]
+
+    def warm(self, text, lang="en"):
+        """Make text a later cache hit: decoded if the mixer is up yet, else just
+        rendered (to disk, for backends that persist)."""
+        import pygame
+        if pygame.mixer.get_init():
+            self.get(text, lang)
+        else:
+            self.render(text, lang)
+
+    def render(self, text, lang="en"):
+        """(backend rank, clip) from the first backend that has or can make text.
+
+        The clip is a disk-tier path or in-memory audio bytes.
+        """
+        for rank, b in enumerate(self.backends):
+            fn = self.path(text, lang, b.ext) if b.persist else None
+            if fn is not None and fn.exists():
+                fn.touch()   # mtime doubles as the disk tier's LRU clock
+                self.stats["disk_hit"] += 1
+                return rank, fn
+            if not b.up():
+                continue
+            data = self._synth(b, text, lang)
+            if data is None:
+                continue
+            self.stats["miss"] += 1
+            if rank:
+                self.stats["fallback"] += 1
+            if fn is not None:
+                self._save(fn, data)
+            return rank, data
+        raise RuntimeError(f"no TTS backend available for {text!r}")
+
+    def _synth(self, b, text, lang):
+        t = time.perf_counter()
+        try:
+            with tracer.span(f"tts.synth.{b.name}"):
+                data = b.synth(text, lang)
+        except Exception as e:
+            b.stats["fail"] += 1
+            b.down_until = time.monotonic() + BACKEND_COOLDOWN
+            dbg(f"TTS {b.name} failed, passing it over for {BACKEND_COOLDOWN}s:", e)
+            return None
+        b.stats["ok"]      += 1
+        b.stats["seconds"] += time.perf_counter() - t
+        return data
+
+    def _save(self, fn, data):
+        self.dir.mkdir(exist_ok=True)
+        tmp = fn.with_suffix(".part")
+        tmp.write_bytes(data)
+        tmp.replace(fn)
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self.dir.glob("*.mp3"))
+            else:
+                self._disk_bytes += len(data)
+        self._trim_disk()
+
+    def stats_line(self):
+        return f"{self.stats}; " + ", ".join(b.stats_line() for b in self.backends)
+
+    def _remember(self, k, rank, snd):
+        with self._lock:
+            self._mem[k] = (rank, snd)
+            self._mem.move_to_end(k)
+            while len(self._mem) > self.max_clips:
+                self._mem.popitem(last=False)
+
+    def _trim_disk(self):
+        with self._lock:
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            files = sorted(self.dir.glob("*.mp3"), key=lambda p: p.stat().st_mtime)
+            for p in files:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    size = p.stat().st_size
+                    p.unlink()
+                    self._disk_bytes -= size
+                except Exception:
+                    pass
+
+    def prewarm(self, texts, lang="en"):
+        """Synthesize texts in the background so later plays are cache hits.
+
+        Batches queue behind each other on one worker thread.
+        """
+        def run():
+            for text in dict.fromkeys(texts):   # de-dup, keep order
+                try:
+                    self.warm(text, lang)
+                except Exception as e:
+                    dbg("prewarm error:", text, e)
+            dbg("TTS prewarm done:", self.stats_line())
+        self._prewarm_pool.submit(run)
+
+
+class AnnouncementPrefetcher:
+    """Worker pool that renders announcement clips ahead of when they're spoken."""
+
+    def __init__(self, cache, workers=3):
+        self.cache    = cache
+        self.pool     = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-prefetch")
+        self._pending = set()
+        self._lock    = threading.Lock()
+
+    def render(self, texts, lang="en"):
+        """Queue texts for synthesis; already-queued phrases are not queued twice."""
+        for text in texts:
+            if not text:
+                continue
+            k = self.cache.key(text, lang)
+            with self._lock:
+                if k in self._pending:
+                    continue
+                self._pending.add(k)
+            self.pool.submit(self._render_one, k, text, lang)
+
+    def _render_one(self, k, text, lang):
+        try:
+            # before audio init (a cached slate at startup) there's no mixer to decode with
+            self.cache.warm(text, lang)
+        except Exception as e:
+            dbg("prefetch error:", text, e)
+        finally:
+            with self._lock:
+                self._pending.discard(k)
+
+
+class AudioScheduler:
+    """Single playback thread fed by a priority queue of speech clips.
+
+    Clips belong to a group (one game's announcement, the loading prompt, …).
+    announce() preempts whatever is playing and drops every other group's
+    pending clips; prompt() is coalesced per group and can repeat until
+    cancelled; queue() just lines clips up behind what's there. Waiting for
+    a clip to finish is a condition wait bounded by the clip's length, so a
+    preemption wakes the thread immediately.
+    """
+
+    ANNOUNCE, PROMPT = 0, 1
+
+    def __init__(self, cache):
+        self.cache    = cache
+        self._cond    = threading.Condition()
+        self._queue   = []                 # heap of (priority, seq, group, text)
+        self._seq     = itertools.count()
+        self._repeats = {}                 # group -> [text, interval, next_due]
+        self._playing = None               # group currently on the channel
+        self._stop    = False              # set to cut the current clip short
+        self._channel = None
+        self._pending = None               # (group, announced at, trace attrs) until it plays
+
+    def start(self):
+        import pygame
+        pygame.mixer.set_reserved(1)
+        self._channel = pygame.mixer.Channel(0)
+        threading.Thread(target=self._run, daemon=True, name="audio").start()
+
+    def announce(self, texts, group, trace=None):
+        """Speak texts in order, preempting and discarding everything else.
+
+        The wait until the first clip plays is traced as tts.first_audio,
+        with trace as its attributes.
+        """
+        with self._cond:
+            self._pending = (group, time.monotonic(), trace or {})
+            self._queue = []
+            self._repeats.clear()
+            for text in texts:
+                if text:
+                    heapq.heappush(self._queue, (self.ANNOUNCE, next(self._seq), group, text))
+            if self._playing is not None:
+                self._stop = True
+            self._cond.notify()
+
+    def prompt(self, text, group, repeat=None):
+        """Queue a low-priority prompt; a group already queued or repeating is left alone."""
+        with self._cond:
+            if group in self._repeats or any(q[2] == group for q in self._queue):
+                return
+            heapq.heappush(self._queue, (self.PROMPT, next(self._seq), group, text))
+            if repeat:
+                self._repeats[group] = [text, repeat, None]
+            self._cond.notify()
+
+    def queue(self, texts, group):
+        """Speak texts after whatever is queued, at prompt priority; no coalescing."""
+        with self._cond:
+            for text in texts:
+                if text:
+                    heapq.heappush(self._queue, (self.PROMPT, next(self._seq), group, text))
+            self._cond.notify()
+
+    def cancel(self, group):
+        """Drop a group's pending clips and repeats, and cut it off if playing."""
+        with self._cond:
+            self._repeats.pop(group, None)
+            self._queue = [q for q in self._queue if q[2] != group]
+            heapq.heapify(self._queue)
+            if self._playing == group:
+                self._stop = True
+            self._cond.notify()
+
+    def _next_item(self):
+        # called with the condition held; blocks until something is due
+        while True:
+            now = time.monotonic()
+            for group, rep in self._repeats.items():
+                if rep[2] is not None and rep[2] <= now \
+                        and not any(q[2] == group for q in self._queue):
+                    rep[2] = None
+                    heapq.heappush(self._queue, (self.PROMPT, next(self._seq), group, rep[0]))
+            if self._queue:
+                return heapq.heappop(self._queue)
+            dues = [r[2] for r in self._repeats.values() if r[2] is not None]
+            self._cond.wait(max(0, min(dues) - now) if dues else None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                _, _, group, text = self._next_item()
+                self._playing, self._stop = group, False
+            try:
+                snd = self.cache.get(text)
+            except Exception as e:
+                dbg("audio synth error:", text, e)
+                snd = None
+            with self._cond:
+                if snd is not None and not self._stop:
+                    self._channel.play(snd)
+                    if self._pending and self._pending[0] == group:
+                        _, t0, trace = self._pending
+                        self._pending = None
+                        tracer.record("tts.first_audio", time.monotonic() - t0, **trace)
+                    self._cond.wait_for(lambda: self._stop, timeout=snd.get_length())
+                    if self._stop:
+                        self._channel.stop()
+                rep = self._repeats.get(group)
+                if rep is not None:
+                    rep[2] = time.monotonic() + rep[1]
+                self._playing = None
+
+
+speech_cache = TTSCache()
+prefetcher   = AnnouncementPrefetcher(speech_cache)
+
+
+def playSound(text):
+    """Blocking one-off playback outside the scheduler."""
+    try:
+        snd = speech_cache.get(text)
+        snd.play()
+        time.sleep(snd.get_length())
+    except Exception as e:
+        print("playSound error:", e)